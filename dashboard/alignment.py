@@ -4,10 +4,15 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
+from dashboard import scenarios
+from dashboard.cache import shared_cache, frame_hash
 from dashboard.constants import DIM_COLORS, RESPONSE_TO_NUMBER, LEVEL_MAP_ORD
 
 def compute_question_gaps(df1: pd.DataFrame) -> pd.DataFrame:
-    """Compute DIFF per assessment question using RESPONSE_TO_NUMBER mapping."""
+    """Compute DIFF per assessment question using RESPONSE_TO_NUMBER mapping (cached, read-only)."""
+    return shared_cache.get_or_compute(("question_gaps", frame_hash(df1)), _compute_question_gaps, df1)
+
+def _compute_question_gaps(df1: pd.DataFrame) -> pd.DataFrame:
     COL_IND   = "INDICATOR | 指标"
     COL_NUM   = "NUMBER | 编号"
     COL_QTXT  = "ASSESSMENT QUESTION | 评估问题 "
@@ -44,6 +49,12 @@ def compute_question_gaps(df1: pd.DataFrame) -> pd.DataFrame:
           .reset_index(drop=True))
     return q
 
+def _table_xlsx(table: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        table.to_excel(writer, index=False, sheet_name="Priorities")
+    return buffer.getvalue()
+
 def _pct_to_frac(x):
     """Accept Series or DataFrame; convert '42%' -> 0.42 else numeric."""
     if isinstance(x, pd.DataFrame):
@@ -74,19 +85,16 @@ def select_goal_columns(df: pd.DataFrame) -> list[str]:
         return []
     return st.multiselect("Filter strategic goal:", options=candidates, default=candidates)
 
-def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
+def alignment_frame(df_1: pd.DataFrame, df_3: pd.DataFrame, selected_goals: list[str]):
+    """Overview rows with utility (_X), maturity gap (_Y) and jittered plot positions; None if nothing to plot."""
     df = df_3.copy()
 
     COL_IND    = "INDICATOR | 指标"
-    COL_DIM    = "DIMENSION | 维度"
     COL_UTIL   = "TOTAL UTILITY | 总效用值"
     COL_GAP    = "MATURITY GAP | 成熟度差距"
     COL_IMPACT = "TOTAL IMPACT | 总影响度 "
     COL_QTXT   = "ASSESSMENT QUESTION | 评估问题 "
 
-    selected_goals = select_goal_columns(df)
-    st.subheader("Impact of indicators on strategic goal(s)")
-
     if COL_QTXT not in df.columns and df_1 is not None and COL_QTXT in df_1.columns:
         look_q = (df_1[[COL_IND, COL_QTXT]]
                   .dropna(subset=[COL_IND, COL_QTXT])
@@ -110,8 +118,7 @@ def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
     df["_X"] = df["TOTAL_UTILITY_NUM"].astype(float)
     df["_Y"] = df["MATURITY_GAP_FRAC"].astype(float)
     if df["_X"].notna().sum() == 0 or df["_Y"].notna().sum() == 0:
-        st.info("No data to plot (check selected goals or input data).")
-        return
+        return None
 
     coords   = df[["_X", "_Y"]].round(5)
     dup_idx  = coords.groupby(["_X", "_Y"]).cumcount()
@@ -122,6 +129,12 @@ def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
     angle    = (dup_idx / grp_size) * 2 * np.pi
     df["_XJ"] = df["_X"] + r_x * np.cos(angle)
     df["_YJ"] = df["_Y"] + r_y * np.sin(angle)
+    return df
+
+def scatter_figure(df: pd.DataFrame) -> go.Figure:
+    """Utility/gap scatter of ``alignment_frame`` output, numbered by total impact."""
+    COL_IND    = "INDICATOR | 指标"
+    COL_DIM    = "DIMENSION | 维度"
 
     fig = go.Figure()
 
@@ -201,20 +214,31 @@ def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
        # margin=dict(b=150),
         hoverlabel=dict(font=dict(size=16, color="black"), bgcolor="white")
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
+def scatter_png_key(df: pd.DataFrame, selected_goals: list[str]):
+    return ("scatter_png", frame_hash(df), tuple(selected_goals))
 
-    fig.write_image(
-    "alignment_scatter.png",
-    format="png",
-    width=1600,    # Breite in Pixel
-    height=900,   # Höhe in Pixel
-    scale=3        # Multiplikator für DPI (3x = sehr scharf)
+def _scatter_png(fig: go.Figure) -> bytes:
+    return fig.to_image(
+        format="png",
+        width=1600,    # Breite in Pixel
+        height=900,   # Höhe in Pixel
+        scale=3        # Multiplikator für DPI (3x = sehr scharf)
     )
 
+def scatter_png(df: pd.DataFrame, selected_goals: list[str]) -> bytes:
+    """High-resolution scatter PNG (Kaleido), rendered once per inputs and shared via the cache."""
+    return shared_cache.get_or_compute(scatter_png_key(df, selected_goals),
+                                       lambda: _scatter_png(scatter_figure(df)))
 
+def priorities_xlsx(table: pd.DataFrame) -> bytes:
+    """Excel export of ``priorities_table``, shared via the cache with the download button."""
+    return shared_cache.get_or_compute(("priorities_xlsx", frame_hash(table)), _table_xlsx, table)
 
-
+def priorities_table(df_1: pd.DataFrame, df: pd.DataFrame, selected_goals: list[str]) -> pd.DataFrame:
+    """Questions with an open gap, ranked by the total impact of their indicator."""
+    COL_IND    = "INDICATOR | 指标"
 
     qg = compute_question_gaps(df_1)
 
@@ -251,6 +275,22 @@ def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
     table["Maturity Level"] = table["LEVEL"].map(_INV)
     table = table.sort_values(["Total Impact"], ascending=[False], kind="mergesort").reset_index(drop=True)
     table.insert(0, "Priority", range(1, len(table) + 1))
+    return table
+
+def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> list[str]:
+    """Render tab 3 and return the selected goal columns."""
+    selected_goals = select_goal_columns(df_3)
+    st.subheader("Impact of indicators on strategic goal(s)")
+
+    df = alignment_frame(df_1, df_3, selected_goals)
+    if df is None:
+        st.info("No data to plot (check selected goals or input data).")
+        return selected_goals
+
+    fig = scatter_figure(df)
+    st.plotly_chart(fig, use_container_width=True)
+
+    table = priorities_table(df_1, df, selected_goals)
 
     st.subheader("Prioritized measures to engange the strategic goal(s)")
 
@@ -301,14 +341,108 @@ def show_alignment_scatter(df_1: pd.DataFrame, df_3: pd.DataFrame) -> None:
         )
         st.markdown(html_table, unsafe_allow_html=True)
 
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-            table.to_excel(writer, index=False, sheet_name="Priorities")
+        xlsx = priorities_xlsx(table)
         st.download_button(
             label="💾 Download as Excel",
-            data=buffer.getvalue(),
+            data=xlsx,
             file_name="priorities.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
     else:
         st.caption("No suitable measures found.")
+
+    if selected_goals:
+        show_what_if(df_1, df, selected_goals)
+    return selected_goals
+
+def _explore_scenarios(data: scenarios.ScenarioData, n: int, budget: int):
+    """Random scenario batch with its budget selection: ``(levels, weights, selected, value)``."""
+    levels, w = scenarios.sample_scenarios(data, n, rng=0)
+    score, gain = scenarios.score_scenarios(data, scenarios.targets_for_levels(data, levels), w)
+    selected, value = scenarios.select_under_budget(score, gain, budget)
+    return levels, w, selected, value
+
+def show_what_if(df_1: pd.DataFrame, df: pd.DataFrame, selected_goals: list[str]) -> None:
+    """What-if exploration of target levels, goal weights and an effort budget (effort = levels raised)."""
+    COL_IND  = "INDICATOR | 指标"
+    COL_QTXT = "ASSESSMENT QUESTION | 评估问题 "
+    LEVEL_MAP_INV = {v: k for k, v in LEVEL_MAP_ORD.items()}
+
+    overview = df[[COL_IND]].join(_pct_to_frac(df[selected_goals]))
+    data_key = ("scenario_data", frame_hash(df_1), frame_hash(overview))
+    data = shared_cache.get_or_compute(
+        data_key, scenarios.build_scenario_data, compute_question_gaps(df_1), overview, selected_goals,
+    )
+    max_budget = int(np.clip(4 - data.current, 0, None).sum())
+    if not len(data.current) or max_budget == 0:
+        return
+
+    st.subheader("What-if scenarios")
+    c1, c2 = st.columns(2)
+    with c1:
+        level = st.select_slider("Target maturity level:", options=[0, *LEVEL_MAP_INV],
+                                 value=4, format_func=lambda v: LEVEL_MAP_INV.get(v, "Workbook targets"),
+                                 key="wi_level")
+        budget = st.slider("Effort budget (levels raised):", 1, max_budget,
+                           value=min(10, max_budget), key="wi_budget")
+    with c2:
+        weights = np.array([[
+            st.slider(f"Weight: {g}", 0.0, 1.0, 1.0, 0.05, key=f"wi_w_{i}")
+            for i, g in enumerate(selected_goals)
+        ]])
+
+    targets = data.target if level == 0 else scenarios.targets_for_levels(data, [level])
+    score, gain = scenarios.score_scenarios(data, targets, weights)
+    selected, value = scenarios.select_under_budget(score, gain, budget)
+    idx = np.flatnonzero(selected[0])
+    idx = idx[np.argsort(-score[0, idx], kind="stable")]
+    measures = data.questions.iloc[idx].assign(**{"Levels raised": gain[0, idx].astype(int),
+                                                  "Score": score[0, idx]})
+    st.caption(f"{len(idx)} measures · {int(gain[0, idx].sum())} of {budget} levels used · "
+               f"total score {value[0]:.2f}")
+    if len(measures):
+        st.dataframe(
+            measures.rename(columns={COL_QTXT: "Measure", COL_IND: "Indicator"})
+                    .assign(**{"Maturity Level": lambda t: t["LEVEL"].map(LEVEL_MAP_INV)})
+                    [["Measure", "Indicator", "Maturity Level", "Levels raised", "Score"]],
+            hide_index=True, use_container_width=True,
+            column_config={"Score": st.column_config.NumberColumn(format="%.2f")},
+        )
+
+    with st.expander("Explore random scenarios", expanded=False):
+        c1, c2 = st.columns(2)
+        with c1:
+            n = st.select_slider("Number of scenarios:", options=[1000, 5000, 10000, 20000],
+                                 value=5000, key="wi_n")
+        with c2:
+            k = st.slider("Show best:", 1, 20, 5, key="wi_k")
+        # Expanders run on every rerun, so the batch is only rebuilt when its inputs change.
+        levels, w, selected, value = shared_cache.get_or_compute(
+            ("scenario_explore", *data_key[1:], n, budget), _explore_scenarios, data, n, budget,
+        )
+        best = scenarios.top_k(value, k)
+        score, gain = scenarios.score_scenarios(data, scenarios.targets_for_levels(data, levels[best]), w[best])
+        st.dataframe(
+            pd.DataFrame(w[best], columns=selected_goals)
+              .assign(**{"Mean target level": levels[best].mean(axis=1), "Total score": value[best]})
+              .rename_axis("Scenario").reset_index().assign(Scenario=lambda t: t["Scenario"] + 1),
+            hide_index=True, use_container_width=True,
+            column_config={g: st.column_config.NumberColumn(format="%.2f") for g in selected_goals},
+        )
+
+        # Measure set of each top-k scenario, in the same order as above
+        sets = []
+        for row, s_idx in enumerate(best):
+            idx = np.flatnonzero(selected[s_idx])
+            idx = idx[np.argsort(-score[row, idx], kind="stable")]
+            sets.append(data.questions.iloc[idx].assign(**{
+                "Scenario": row + 1, "Levels raised": gain[row, idx].astype(int), "Score": score[row, idx],
+            }))
+        if sets:
+            st.dataframe(
+                pd.concat(sets, ignore_index=True)
+                  .rename(columns={COL_QTXT: "Measure", COL_IND: "Indicator"})
+                  [["Scenario", "Measure", "Indicator", "Levels raised", "Score"]],
+                hide_index=True, use_container_width=True,
+                column_config={"Score": st.column_config.NumberColumn(format="%.2f")},
+            )
@@ -18,11 +18,14 @@ mpl.rcParams["font.family"] = "Noto Sans SC"
 mpl.rcParams["axes.unicode_minus"] = False
 
 
-from dashboard.data_io import load_data
+from dashboard.data_io import load_data, WorkbookRejected
 from dashboard.plots import plot_maturity, plot_gap
-from dashboard.ui import file_uploader_left, pills_filters, gap_filters, dim_ind_filters
+from dashboard.ui import file_uploader_left, pills_filters, gap_filters, dim_ind_filters, cache_stats_panel, peer_bands_toggle
 from dashboard.tab_questions import render_questions_table
+from dashboard.tab_history import render_history
 from dashboard.alignment import show_alignment_scatter
+from dashboard.cache import content_hash
+from dashboard.report import report_key, report_panel, start_report
 
 st.set_page_config(page_title="Dashboard for Targeted Transformation", layout="wide")
 st.title("Dashboard for Targeted Transformation")
@@ -31,27 +34,40 @@ col_left, col_right = st.columns([1, 5])
 
 with col_left:
     file_obj = file_uploader_left()
+    cache_stats_panel()
 
 with col_right:
     if not file_obj:
         st.info("Please upload an Excel file to start.")
     else:
-        df_1, df_3 = load_data(file_obj)
+        try:
+            df_1, df_3 = load_data(file_obj)
+        except WorkbookRejected as exc:
+            st.error(f"{file_obj.name}: {exc}")
+            st.stop()
 
-        tab1, tab2, tab3, tab4 = st.tabs([
-            "Assessment Results", "Gap Analysis", "Priorization of Measures", "All Questions"
+        tab1, tab2, tab3, tab4, tab5 = st.tabs([
+            "Assessment Results", "Gap Analysis", "Priorization of Measures", "All Questions", "Trends"
         ])
 
         with tab1:
-            df1_f = pills_filters(df_1, key_prefix="t1")
-            plot_maturity(df1_f)
+            maturity_masks = pills_filters(df_1, key_prefix="t1")
+            bands = peer_bands_toggle(key_prefix="t1")
+            plot_maturity(df_1, *maturity_masks, bands=bands)
 
         with tab2:
-            df1_gap = gap_filters(df_1, key_prefix="t2gap") 
-            plot_gap(df1_gap)
+            gap_masks = gap_filters(df_1, key_prefix="t2gap")
+            plot_gap(df_1, *gap_masks)
         with tab3:
-            show_alignment_scatter(df_1, df_3)
+            goals = show_alignment_scatter(df_1, df_3)
             
         with tab4:
-            dfq = dim_ind_filters(df_1, key_prefix="t4")
-            render_questions_table(dfq)
+            rows = dim_ind_filters(df_1, key_prefix="t4")
+            render_questions_table(df_1, rows)
+
+        with tab5:
+            render_history(df_1, file_obj)
+
+        with col_left:
+            key = report_key(content_hash(file_obj), maturity_masks, gap_masks, goals, bands)
+            report_panel(key, lambda: start_report(key, df_1, df_3, maturity_masks, gap_masks, goals, bands))
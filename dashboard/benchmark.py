@@ -0,0 +1,176 @@
+"""Peer benchmarking over a corpus of assessment workbooks.
+
+Only count tables are stored (next to the assessment history), so adding a workbook is an
+incremental update and percentiles, means and level shares are read without rescanning the corpus.
+Usage: ``python -m dashboard.benchmark peers/*.xlsx``
+"""
+import io
+import os
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard.cache import shared_cache, content_hash
+from dashboard.constants import HISTORY_DB_PATH, RESPONSE_TO_NUMBER
+from dashboard.history import connect, COL_IND, COL_CURR
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS benchmark_assessments (
+    content_hash  TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS benchmark_level_counts (
+    indicator        TEXT NOT NULL,
+    level            INTEGER NOT NULL,
+    response_number  INTEGER NOT NULL,
+    n                INTEGER NOT NULL,
+    PRIMARY KEY (indicator, level, response_number)
+);
+CREATE TABLE IF NOT EXISTS benchmark_indicator_counts (
+    indicator  TEXT NOT NULL,
+    steps      INTEGER NOT NULL,
+    n          INTEGER NOT NULL,
+    PRIMARY KEY (indicator, steps)
+);
+"""
+
+# Indicator maturity in ring units (0..4): each of the four levels adds (response - 1) / 3,
+# i.e. 0 for "Not implemented yet" up to 1 for "Fully implemented". Stored as integer thirds.
+# Unlike the history trends (a share over answered questions only, see history._INDICATOR_SQL),
+# "Don't know", "Not relevant" and empty answers add 0 here: the bands are drawn on the maturity
+# ring, where every level of an indicator has a position and an unanswered level is not filled.
+STEPS_PER_LEVEL = 3
+
+
+def _connect(path=None, create=True):
+    return connect(path, create=create, schema=_SCHEMA)
+
+
+def _db_version(path=None):
+    """(mtime, size) of the database and its WAL file, None where missing.
+
+    Changes whenever any process commits, e.g. ``python -m dashboard.benchmark`` next to a running server.
+    """
+    path = str(path or HISTORY_DB_PATH)
+    version = []
+    for p in (path, path + "-wal"):
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((st.st_mtime_ns, st.st_size))
+    return tuple(version)
+
+
+def indicator_steps(df1: pd.DataFrame) -> pd.Series:
+    """Maturity per indicator in thirds of a level (0..12); unanswered levels count as 0."""
+    resp = df1[COL_CURR].map(RESPONSE_TO_NUMBER)
+    steps = (resp.where(resp.between(1, 4), 1) - 1).fillna(0).astype(int)
+    return steps.groupby(df1[COL_IND].astype(str)).sum()
+
+
+def add_workbook(df1: pd.DataFrame, workbook_hash: str, path=None) -> bool:
+    """Add one parsed workbook to the peer aggregates; returns False if it is already included."""
+    rows = df1.dropna(subset=[COL_IND])
+    resp = rows[COL_CURR].map(RESPONSE_TO_NUMBER).fillna(-1).astype(int)
+    level_counts = (pd.DataFrame({"indicator": rows[COL_IND].astype(str), "level": rows["LEVEL"].astype(int),
+                                  "response_number": resp})
+                      .value_counts().reset_index(name="n"))
+    steps = indicator_steps(rows)
+    with closing(_connect(path)) as conn, conn:
+        cur = conn.execute("INSERT OR IGNORE INTO benchmark_assessments (content_hash) VALUES (?)", (workbook_hash,))
+        if cur.rowcount == 0:
+            return False
+        conn.executemany(
+            "INSERT INTO benchmark_level_counts (indicator, level, response_number, n) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (indicator, level, response_number) DO UPDATE SET n = n + excluded.n",
+            level_counts[["indicator", "level", "response_number", "n"]].itertuples(index=False, name=None),
+        )
+        conn.executemany(
+            "INSERT INTO benchmark_indicator_counts (indicator, steps, n) VALUES (?, ?, 1)"
+            " ON CONFLICT (indicator, steps) DO UPDATE SET n = n + 1",
+            [(ind, int(s)) for ind, s in steps.items()],
+        )
+    return True
+
+
+def _corpus_size(path) -> int:
+    conn = _connect(path, create=False)
+    if conn is None:
+        return 0
+    with closing(conn):
+        return conn.execute("SELECT COUNT(*) FROM benchmark_assessments").fetchone()[0]
+
+
+def corpus_size(path=None) -> int:
+    """Number of workbooks in the corpus; cached until the database files change."""
+    version = _db_version(path)
+    if version[0] is None:
+        return 0
+    return shared_cache.get_or_compute(("benchmark_corpus_size", str(path), version), _corpus_size, path)
+
+
+def _weighted_percentiles(values: np.ndarray, counts: np.ndarray, qs) -> list:
+    cum = np.cumsum(counts)
+    return [float(values[np.searchsorted(cum, q / 100 * cum[-1], side="left")]) for q in qs]
+
+
+def _indicator_bands(path, percentiles) -> pd.DataFrame:
+    with closing(_connect(path)) as conn:
+        counts = pd.read_sql_query(
+            "SELECT indicator, steps, n FROM benchmark_indicator_counts ORDER BY indicator, steps", conn)
+    out = []
+    for ind, g in counts.groupby("indicator", sort=False):
+        vals = g["steps"].to_numpy() / STEPS_PER_LEVEL
+        n = g["n"].to_numpy()
+        out.append([ind, int(n.sum()), float((vals * n).sum() / n.sum()),
+                    *_weighted_percentiles(vals, n, percentiles)])
+    return pd.DataFrame(out, columns=["indicator", "n", "mean", *[f"p{q}" for q in percentiles]])
+
+
+def indicator_bands(percentiles=(25, 50, 75), path=None) -> pd.DataFrame:
+    """Peer maturity per indicator in ring units (0..4): count, mean and percentiles."""
+    key = ("benchmark_bands", str(path), corpus_size(path), tuple(percentiles))
+    return shared_cache.get_or_compute(key, _indicator_bands, path, tuple(percentiles))
+
+
+def level_shares(path=None) -> pd.DataFrame:
+    """Share of peers per indicator and level reaching each RESPONSE_TO_NUMBER value."""
+    conn = _connect(path, create=False)
+    if conn is None:
+        return pd.DataFrame()
+    with closing(conn):
+        counts = pd.read_sql_query("SELECT indicator, level, response_number, n FROM benchmark_level_counts", conn)
+    if counts.empty:
+        return counts
+    shares = counts.pivot_table(index=["indicator", "level"], columns="response_number", values="n",
+                                aggfunc="sum", fill_value=0)
+    return shares.div(shares.sum(axis=1), axis=0)
+
+
+def main(argv=None) -> int:
+    from dashboard.data_io import inspect_workbook, load_data, WorkbookRejected
+
+    files = [Path(a) for a in (argv if argv is not None else sys.argv[1:])]
+    if not files:
+        print(__doc__.strip().splitlines()[-1])
+        return 1
+    added = 0
+    for f in files:
+        data = f.read_bytes()
+        try:
+            inspect_workbook(io.BytesIO(data))
+            df1, _ = load_data(io.BytesIO(data))
+        except WorkbookRejected as exc:
+            print(f"Skipped {f}: {exc}", file=sys.stderr)
+            continue
+        added += add_workbook(df1, content_hash(data))
+    print(f"Added {added} of {len(files)} workbook(s); corpus size: {corpus_size()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
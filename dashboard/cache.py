@@ -0,0 +1,132 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from dashboard.constants import CACHE_BUDGET_BYTES
+
+
+def content_hash(data) -> str:
+    """SHA-256 of raw bytes or of an uploaded file's contents."""
+    if hasattr(data, "getvalue"):
+        data = data.getvalue()
+    return hashlib.sha256(data).hexdigest()
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    """Stable hash of a DataFrame's values, index and column labels."""
+    h = hashlib.sha256()
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    h.update(repr(list(df.columns)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def estimate_size(obj) -> int:
+    """Approximate memory footprint in bytes (deep for frames and containers)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True, deep=True))
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, (tuple, list)):
+        return sys.getsizeof(obj) + sum(estimate_size(o) for o in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    return sys.getsizeof(obj)
+
+
+class SharedCache:
+    """Process-wide LRU cache bounded by an approximate memory budget.
+
+    Entries are keyed by tuples such as ``(kind, content_hash, *params)`` and are
+    shared between all Streamlit sessions of the server process. Cached values
+    must be treated as read-only by callers.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = int(budget_bytes)
+        self._entries = OrderedDict()   # key -> (value, size)
+        self._lock = threading.RLock()
+        self._pending = {}              # key -> Event while the first caller computes it
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else int(size)
+        with self._lock:
+            if key in self._entries:
+                self.size_bytes -= self._entries.pop(key)[1]
+            if size > self.budget_bytes:
+                # Larger than the whole budget: never cache, but do not flush others either.
+                return value
+            self._entries[key] = (value, size)
+            self.size_bytes += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, fn, *args, **kwargs):
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Concurrent misses on the same key compute once: later callers wait for the first one.
+        """
+        sentinel = object()
+        while True:
+            with self._lock:
+                value = self.get(key, sentinel)
+                if value is not sentinel:
+                    return value
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            pending.wait()
+            # The first caller either stored the value or failed; look again (and compute if needed).
+        try:
+            return self.put(key, fn(*args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self.size_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _evict(self):
+        while self.size_bytes > self.budget_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.size_bytes -= size
+            self.evictions += 1
+
+
+# Module-level singleton: Streamlit imports modules once per server process.
+shared_cache = SharedCache(CACHE_BUDGET_BYTES)
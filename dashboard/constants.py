@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 SHEET_NAME_1 = "Assessment + Target Level"
 SHEET_NAME_2 = "Overview"
 
@@ -11,6 +14,12 @@ RESPONSE_TO_NUMBER = {
     None: -1,
     "nan": -1
 }
+ACTION_BUCKETS = [
+    "No action required | 无需采取任何行动",
+    "Limited action required | 仅需采取有限行动",
+    "Significant action required | 需要采取重大行动",
+    "Extensive action required | 需要采取广泛行动",
+]
 NUMBER_TO_GRAY = {1: 0.1, 2: 0.3, 3: 0.7, 4: 1.0}
 
 LEVEL_MAP_FRAC = {
@@ -32,3 +41,23 @@ DIM_COLORS = {
     "External Integration | 外部整合":    "#7fcac0",
     "Engineering | 工程":               "#7fcac0",
 }
+
+# Process-wide cache for parsed workbooks, analytics and rendered artifacts (MB, env-configurable)
+CACHE_BUDGET_BYTES = int(float(os.environ.get("DASHBOARD_CACHE_MB", "512")) * 1024 * 1024)
+
+# Append-only SQLite store for longitudinal assessment history (env-configurable)
+HISTORY_DB_PATH = os.environ.get("DASHBOARD_HISTORY_DB", "assessment_history.db")
+
+# Background report bundles: worker threads, bundles kept on disk and their location
+REPORT_WORKERS = int(os.environ.get("DASHBOARD_REPORT_WORKERS", "2"))
+REPORT_KEEP = int(os.environ.get("DASHBOARD_REPORT_KEEP", "32"))
+REPORT_DIR = os.environ.get("DASHBOARD_REPORT_DIR", os.path.join(tempfile.gettempdir(), "dashboard-reports"))
+
+# Upload guardrails, checked before a workbook is parsed (env-configurable)
+UPLOAD_MAX_BYTES = int(float(os.environ.get("DASHBOARD_UPLOAD_MAX_MB", "20")) * 1024 * 1024)
+UPLOAD_MAX_UNZIPPED_BYTES = int(float(os.environ.get("DASHBOARD_UPLOAD_MAX_UNZIPPED_MB", "200")) * 1024 * 1024)
+# Per zip entry, checked before openpyxl reads any XML: shared strings table and each worksheet
+UPLOAD_MAX_SHARED_STRINGS_BYTES = int(float(os.environ.get("DASHBOARD_UPLOAD_MAX_SHARED_STRINGS_MB", "16")) * 1024 * 1024)
+UPLOAD_MAX_SHEET_XML_BYTES = int(float(os.environ.get("DASHBOARD_UPLOAD_MAX_SHEET_XML_MB", "32")) * 1024 * 1024)
+UPLOAD_MAX_ROWS = int(os.environ.get("DASHBOARD_UPLOAD_MAX_ROWS", "5000"))
+UPLOAD_MAX_COLS = int(os.environ.get("DASHBOARD_UPLOAD_MAX_COLS", "100"))
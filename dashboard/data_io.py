@@ -1,9 +1,129 @@
+import io
+import zipfile
+
+import openpyxl
 import pandas as pd
-from dashboard.constants import SHEET_NAME_1, SHEET_NAME_2
+from dashboard.cache import shared_cache, content_hash
+from dashboard.constants import (
+    SHEET_NAME_1, SHEET_NAME_2, RESPONSE_TO_NUMBER, ACTION_BUCKETS,
+    UPLOAD_MAX_BYTES, UPLOAD_MAX_UNZIPPED_BYTES, UPLOAD_MAX_ROWS, UPLOAD_MAX_COLS,
+    UPLOAD_MAX_SHARED_STRINGS_BYTES, UPLOAD_MAX_SHEET_XML_BYTES,
+)
 
-def load_data(file_obj):
-    """Read required sheets and minimal columns; add LEVEL afterwards."""
-    df1 = pd.read_excel(file_obj, sheet_name=SHEET_NAME_1, usecols="C:J", skiprows=2).copy().sort_values(by="NUMBER | 编号").reset_index(drop=True)
+# Sheet -> (1-based header row, first/last column read by load_data, headers the dashboard needs)
+REQUIRED_LAYOUT = {
+    SHEET_NAME_1: (3, 3, 10, [
+        "NUMBER | 编号", "DIMENSION | 维度", "INDICATOR | 指标",
+        "CURRENT IMPLEMENTATION LEVEL | 当前实施水平", "TARGET IMPLEMENTATION LEVEL | 目标实施层级",
+    ]),
+    SHEET_NAME_2: (2, 3, 14, ["INDICATOR | 指标"]),
+}
+
+
+class WorkbookRejected(ValueError):
+    """Workbook is too large, malformed or not based on the assessment template."""
+
+
+def _entry_limit(name: str):
+    """Uncompressed size limit for the XML parts openpyxl loads in full or streams row by row."""
+    if name == "xl/sharedStrings.xml":
+        return UPLOAD_MAX_SHARED_STRINGS_BYTES
+    if name.startswith("xl/worksheets/") and name.endswith(".xml"):
+        return UPLOAD_MAX_SHEET_XML_BYTES
+    return None
+
+
+def _size(file_obj) -> int:
+    size = getattr(file_obj, "size", None)
+    if size is None:
+        size = file_obj.seek(0, io.SEEK_END)
+    file_obj.seek(0)
+    return size
+
+
+def inspect_workbook(file_obj) -> dict:
+    """Check size, archive, sheet dimensions and headers without parsing the sheets.
+
+    Uses the zip directory (total and per-entry uncompressed sizes) and openpyxl's read-only
+    mode (dimension tag + header row only).
+    Returns ``{sheet: (rows, cols)}``; raises WorkbookRejected.
+    """
+    size = _size(file_obj)
+    if size > UPLOAD_MAX_BYTES:
+        raise WorkbookRejected(f"File is {size / 2**20:.1f} MB, the limit is {UPLOAD_MAX_BYTES / 2**20:.0f} MB.")
+    if not zipfile.is_zipfile(file_obj):
+        raise WorkbookRejected("Not a valid .xlsx file.")
+    file_obj.seek(0)
+    try:
+        with zipfile.ZipFile(file_obj) as zf:
+            entries = zf.infolist()
+    except zipfile.BadZipFile as exc:
+        raise WorkbookRejected(f"Not a valid .xlsx file ({exc}).") from exc
+    unzipped = sum(i.file_size for i in entries)
+    if unzipped > UPLOAD_MAX_UNZIPPED_BYTES:
+        raise WorkbookRejected(f"Workbook expands to {unzipped / 2**20:.0f} MB, "
+                               f"the limit is {UPLOAD_MAX_UNZIPPED_BYTES / 2**20:.0f} MB.")
+    for info in entries:
+        limit = _entry_limit(info.filename)
+        if limit is not None and info.file_size > limit:
+            raise WorkbookRejected(f"'{info.filename}' expands to {info.file_size / 2**20:.0f} MB, "
+                                   f"the limit is {limit / 2**20:.0f} MB.")
+
+    file_obj.seek(0)
+    try:
+        wb = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+    except Exception as exc:
+        raise WorkbookRejected(f"Workbook could not be opened ({exc}).") from exc
+    try:
+        dims = {}
+        for sheet, (header_row, first_col, last_col, required) in REQUIRED_LAYOUT.items():
+            if sheet not in wb.sheetnames:
+                raise WorkbookRejected(f"Sheet '{sheet}' is missing.")
+            ws = wb[sheet]
+            rows, cols = ws.max_row, ws.max_column   # from the <dimension> tag; None if absent
+            if rows is not None and rows > UPLOAD_MAX_ROWS:
+                raise WorkbookRejected(f"Sheet '{sheet}' has {rows} rows, the limit is {UPLOAD_MAX_ROWS}.")
+            if cols is not None and cols > UPLOAD_MAX_COLS:
+                raise WorkbookRejected(f"Sheet '{sheet}' has {cols} columns, the limit is {UPLOAD_MAX_COLS}.")
+            header = next(ws.iter_rows(min_row=header_row, max_row=header_row,
+                                       min_col=first_col, max_col=last_col, values_only=True), ())
+            missing = [h for h in required if h not in header]
+            if missing:
+                raise WorkbookRejected(f"Sheet '{sheet}' is missing column(s): {', '.join(missing)}.")
+            dims[sheet] = (rows, cols)
+    finally:
+        wb.close()
+        file_obj.seek(0)
+    return dims
+
+
+def add_derived_columns(df1):
+    """Add RESPONSE_NUMBER, TARGET_NUMBER, DIFF and BUCKET once, at parse time (in place)."""
+    df1["RESPONSE_NUMBER"] = df1["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].map(RESPONSE_TO_NUMBER)
+    df1["TARGET_NUMBER"] = df1["TARGET IMPLEMENTATION LEVEL | 目标实施层级"].map(RESPONSE_TO_NUMBER)
+    df1["DIFF"] = pd.to_numeric(df1["TARGET_NUMBER"], errors="coerce").fillna(0) \
+                - pd.to_numeric(df1["RESPONSE_NUMBER"], errors="coerce").fillna(0)
+    # DIFF 1..3 -> limited/significant/extensive action, anything else -> no action
+    bucket = df1["DIFF"].where(df1["DIFF"].isin([1, 2, 3]), 0).astype(int)
+    df1["BUCKET"] = bucket.map(dict(enumerate(ACTION_BUCKETS)))
+    return df1
+
+def _parse_workbook(data: bytes):
+    # nrows caps the parse for workbooks whose dimension tag is missing or wrong
+    df1 = pd.read_excel(io.BytesIO(data), sheet_name=SHEET_NAME_1, usecols="C:J", skiprows=2, nrows=UPLOAD_MAX_ROWS + 1)
+    df3 = pd.read_excel(io.BytesIO(data), sheet_name=SHEET_NAME_2, usecols="C:N", skiprows=1, nrows=UPLOAD_MAX_ROWS + 1)
+    if len(df1) > UPLOAD_MAX_ROWS or len(df3) > UPLOAD_MAX_ROWS:
+        raise WorkbookRejected(f"Workbook has more than {UPLOAD_MAX_ROWS} rows.")
+    df1 = df1.sort_values(by="NUMBER | 编号").reset_index(drop=True)
     df1["LEVEL"] = ((df1.index % 4) + 1)
-    df3 = pd.read_excel(file_obj, sheet_name=SHEET_NAME_2, usecols="C:N", skiprows=1).copy()
+    add_derived_columns(df1)
     return df1, df3
+
+def load_data(file_obj):
+    """Read required sheets and minimal columns; add LEVEL afterwards.
+
+    Parsed frames are shared across sessions via the process-wide cache (keyed by
+    content hash), so callers must not modify them in place.
+    """
+    data = file_obj.getvalue()
+    return shared_cache.get_or_compute(("workbook", content_hash(data)), _parse_workbook, data)
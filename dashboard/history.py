@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime, timezone
+
+import pandas as pd
+
+from dashboard.constants import HISTORY_DB_PATH, RESPONSE_TO_NUMBER
+
+COL_NUM  = "NUMBER | 编号"
+COL_DIM  = "DIMENSION | 维度"
+COL_IND  = "INDICATOR | 指标"
+COL_CURR = "CURRENT IMPLEMENTATION LEVEL | 当前实施水平"
+COL_TARG = "TARGET IMPLEMENTATION LEVEL | 目标实施层级"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id            INTEGER PRIMARY KEY,
+    organisation  TEXT NOT NULL,
+    assessed_on   TEXT NOT NULL,
+    content_hash  TEXT NOT NULL UNIQUE,
+    ingested_at   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    assessment_id    INTEGER NOT NULL REFERENCES assessments(id),
+    number           TEXT,
+    dimension        TEXT,
+    indicator        TEXT NOT NULL,
+    level            INTEGER NOT NULL,
+    response_number  INTEGER,
+    target_number    INTEGER
+);
+CREATE INDEX IF NOT EXISTS ix_assessments_org_date ON assessments(organisation, assessed_on);
+CREATE INDEX IF NOT EXISTS ix_responses_assessment ON responses(assessment_id);
+CREATE INDEX IF NOT EXISTS ix_responses_ind_level  ON responses(indicator, level);
+"""
+
+# Per assessment and indicator: share of maturity reached (1 -> 0 %, 4 -> 100 %) and mean open gap
+# in levels, over answered questions only ("Don't know" / "Not relevant" / empty are skipped), so
+# marking a question "Not relevant" in a later assessment does not show up as a regression.
+# Peer bands (benchmark.STEPS_PER_LEVEL) count unanswered levels as 0 instead, in ring units.
+_INDICATOR_SQL = """
+SELECT a.id AS assessment_id, a.organisation, a.assessed_on, r.dimension, r.indicator,
+       AVG(CASE WHEN r.response_number BETWEEN 1 AND 4
+                THEN (r.response_number - 1) / 3.0 END) AS maturity,
+       AVG(CASE WHEN r.response_number BETWEEN 1 AND 4 AND r.target_number BETWEEN 1 AND 4
+                THEN MAX(r.target_number - r.response_number, 0) END) AS gap
+FROM assessments a
+JOIN responses r ON r.assessment_id = a.id
+WHERE a.organisation = ?
+GROUP BY a.id, r.indicator
+"""
+
+
+_initialised = set()            # (path, schema) pairs set up by this process
+_init_lock = threading.Lock()
+
+
+def connect(path=None, create=True, schema=_SCHEMA):
+    """Open the store; ``schema`` is applied once per process and path.
+
+    With ``create=False`` a missing database is not created and None is returned.
+    """
+    path = str(path or HISTORY_DB_PATH)
+    if not create and not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(path, timeout=30)
+    if (path, schema) not in _initialised:
+        with _init_lock:
+            if (path, schema) not in _initialised:
+                conn.execute("PRAGMA journal_mode=WAL")   # persistent, stored in the database file
+                conn.executescript(schema)
+                _initialised.add((path, schema))
+    return conn
+
+
+def _as_int(v):
+    return None if pd.isna(v) else int(v)
+
+
+def ingest(df1: pd.DataFrame, content_hash: str, organisation: str, assessed_on: date, path=None):
+    """Append one parsed workbook (``load_data`` output) to the store.
+
+    Workbooks are identified by content hash and ingested at most once.
+    Returns ``(assessment_id, created)``.
+    """
+    rows = df1.dropna(subset=[COL_NUM, COL_IND])
+    resp = rows[COL_CURR].map(RESPONSE_TO_NUMBER)
+    targ = rows[COL_TARG].map(RESPONSE_TO_NUMBER)
+    with closing(connect(path)) as conn, conn:
+        hit = conn.execute("SELECT id FROM assessments WHERE content_hash = ?", (content_hash,)).fetchone()
+        if hit:
+            return hit[0], False
+        cur = conn.execute(
+            "INSERT INTO assessments (organisation, assessed_on, content_hash, ingested_at) VALUES (?, ?, ?, ?)",
+            (organisation.strip(), assessed_on.isoformat(), content_hash,
+             datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        )
+        assessment_id = cur.lastrowid
+        conn.executemany(
+            "INSERT INTO responses (assessment_id, number, dimension, indicator, level, response_number, target_number)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (assessment_id, str(num), None if pd.isna(dim) else str(dim), str(ind), int(lvl), _as_int(r), _as_int(t))
+                for num, dim, ind, lvl, r, t in zip(
+                    rows[COL_NUM], rows[COL_DIM], rows[COL_IND], rows["LEVEL"], resp, targ
+                )
+            ],
+        )
+    return assessment_id, True
+
+
+def organisations(path=None) -> list[str]:
+    conn = connect(path, create=False)
+    if conn is None:
+        return []
+    with closing(conn):
+        return [r[0] for r in conn.execute("SELECT DISTINCT organisation FROM assessments ORDER BY organisation")]
+
+
+def indicator_trends(organisation: str, path=None) -> pd.DataFrame:
+    """Maturity and gap per indicator and assessment, with deltas to the previous quarter.
+
+    If several assessments fall into one quarter, the most recent one represents it. Deltas are
+    NaN when the indicator has no assessment in the calendar quarter directly before.
+    """
+    conn = connect(path, create=False)
+    if conn is None:
+        return pd.DataFrame()
+    with closing(conn):
+        df = pd.read_sql_query(_INDICATOR_SQL, conn, params=(organisation,))
+    if df.empty:
+        return df
+    df["assessed_on"] = pd.to_datetime(df["assessed_on"])
+    period = df["assessed_on"].dt.to_period("Q")
+    df["quarter"] = period.astype(str)
+    df["_period"] = period
+    df = (df.sort_values(["indicator", "assessed_on", "assessment_id"])
+            .drop_duplicates(subset=["indicator", "quarter"], keep="last")
+            .reset_index(drop=True))
+    grp = df.groupby("indicator", sort=False)
+    consecutive = grp["_period"].shift() == df["_period"] - 1
+    df["maturity_delta"] = grp["maturity"].diff().where(consecutive)
+    df["gap_delta"] = grp["gap"].diff().where(consecutive)
+    return df.drop(columns="_period")
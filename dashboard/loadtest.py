@@ -0,0 +1,404 @@
+"""Concurrent-session load test against one real Streamlit server.
+
+Starts ``streamlit run app.py`` headless and drives it with simulated users speaking the
+browser's websocket protocol (``/_stcore/stream``). Each session uploads a generated
+workbook through the upload endpoint, runs one warm-up rerun (not timed), then changes the
+multiselects of ``pills_filters``, ``gap_filters``, ``select_goal_columns`` and
+``dim_ind_filters`` in random order. A rerun is timed from the request until the server
+reports the script finished. All tabs are executed on every rerun in Streamlit, so switching
+tabs needs no extra step.
+
+All sessions share the one server process (and its process-wide cache), whose CPU time and
+resident memory are sampled from ``/proc`` for each concurrency level (Linux only).
+
+Usage: ``python -m dashboard.loadtest --users 1 5 20 50 --steps 10``
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from dashboard.constants import SHEET_NAME_1, SHEET_NAME_2, RESPONSE_TO_NUMBER, DIM_COLORS
+
+APP_PATH = Path(__file__).resolve().parent / "app.py"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Widget keys or labels of the multiselects a session plays with
+FILTERS = [
+    "t1_resp", "t1_dims",
+    "t2gap_buckets", "t2gap_dims",
+    "Filter strategic goal:",
+    "t4_dims", "t4_inds",
+]
+
+
+def make_workbook(path, n_indicators=24, seed=0):
+    """Write a synthetic assessment workbook with the layout ``load_data`` expects."""
+    import openpyxl
+
+    rnd = random.Random(seed)
+    responses = [k for k in RESPONSE_TO_NUMBER if isinstance(k, str) and k != "nan"]
+    dims = list(DIM_COLORS)
+    goals = ["Cost", "Quality", "Delivery", "Flexibility", "Sustainability"]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = SHEET_NAME_1
+    ws.append([])
+    ws.append([])
+    ws.append([None, None, "NUMBER | 编号", "DIMENSION | 维度", "INDICATOR | 指标",
+               "ASSESSMENT QUESTION | 评估问题 ", "CURRENT IMPLEMENTATION LEVEL | 当前实施水平",
+               "TARGET IMPLEMENTATION LEVEL | 目标实施层级", "COMMENT", "EVIDENCE"])
+    for i in range(n_indicators):
+        dim = dims[i * len(dims) // n_indicators]
+        for level in range(1, 5):
+            ws.append([None, None, f"{i + 1:02d}.{level}", dim, f"Indicator {i + 1}",
+                       f"Question {i + 1}.{level}", rnd.choice(responses), rnd.choice(responses[:4]),
+                       None, None])
+
+    ov = wb.create_sheet(SHEET_NAME_2)
+    ov.append([])
+    ov.append([None, None, "DIMENSION | 维度", "INDICATOR | 指标", "CURRENT MATURITY", "TARGET MATURITY",
+               "MATURITY GAP | 成熟度差距", *goals, "TOTAL UTILITY | 总效用值", "TOTAL IMPACT | 总影响度 "])
+    for i in range(n_indicators):
+        contrib = [round(rnd.random(), 2) for _ in goals]
+        ov.append([None, None, dims[i * len(dims) // n_indicators], f"Indicator {i + 1}", None, None,
+                   f"{rnd.randint(0, 100)}%", *contrib, sum(contrib), round(rnd.random() * 3, 2)])
+    wb.save(path)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _proc_usage(pid):
+    """CPU seconds (user + system) and resident set size in MB of a process, read from /proc."""
+    with open(f"/proc/{pid}/stat") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()   # fields after the command name
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/status") as fh:
+        rss_kb = next(int(line.split()[1]) for line in fh if line.startswith("VmRSS:"))
+    return cpu, rss_kb / 1024
+
+
+class Server:
+    """``streamlit run app.py`` in a subprocess, stopped on exit of the ``with`` block."""
+
+    def __init__(self, port, log_path, timeout=60.0):
+        self.port = port
+        self.log_path = log_path
+        self.timeout = timeout
+        self.proc = None
+
+    def __enter__(self):
+        cmd = [
+            sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(self.port),
+            "--server.enableXsrfProtection", "false",
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ]
+        # Run from the repository root so .streamlit/config.toml applies as in production.
+        with open(self.log_path, "wb") as log:
+            self.proc = subprocess.Popen(cmd, cwd=APP_PATH.parent.parent, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            self._wait_healthy()
+        except BaseException:
+            self.__exit__()
+            raise
+        return self
+
+    def _wait_healthy(self):
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self.proc.returncode}, see {self.log_path}.")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=2) as r:
+                    if r.status == 200:
+                        return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise TimeoutError(f"Server did not become healthy within {self.timeout:.0f} s, see {self.log_path}.")
+
+    def usage(self):
+        return _proc_usage(self.proc.pid)
+
+    def __exit__(self, *exc):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+
+class Session:
+    """One simulated browser tab: a websocket to the server plus the widget states it sends."""
+
+    def __init__(self, port, timeout):
+        self.port = port
+        self.timeout = timeout
+        self.ws = None
+        self.session_id = None
+        self.uploader_id = None
+        self.multiselects = {}     # widget id -> (label, options) seen in the last run
+        self.widget_states = {}    # widget id -> WidgetState sent with every rerun
+        self.exceptions = 0        # st.exception elements rendered by the app
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        self.ws = await asyncio.wait_for(
+            websocket_connect(f"ws://127.0.0.1:{self.port}/_stcore/stream", max_message_size=1 << 30),
+            self.timeout)
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    def _send(self, back_msg):
+        return self.ws.write_message(back_msg.SerializeToString(), binary=True)
+
+    async def _receive(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        payload = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+        if payload is None:
+            raise ConnectionError("Server closed the websocket.")
+        msg = ForwardMsg()
+        msg.ParseFromString(payload)
+        return msg
+
+    def _on_element(self, element):
+        kind = element.WhichOneof("type")
+        if kind == "multiselect":
+            self.multiselects[element.multiselect.id] = (element.multiselect.label,
+                                                         list(element.multiselect.options))
+        elif kind == "file_uploader":
+            self.uploader_id = element.file_uploader.id
+        elif kind == "exception":
+            self.exceptions += 1
+
+    async def rerun(self):
+        """Send the current widget states and wait until the script run finishes; returns seconds."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.widget_states.values())
+        self.multiselects = {}
+        t0 = time.perf_counter()
+        await self._send(msg)
+        while True:
+            fwd = await self._receive()
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session" and fwd.new_session.HasField("initialize"):
+                self.session_id = fwd.new_session.initialize.session_id
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._on_element(fwd.delta.new_element)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    return time.perf_counter() - t0
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("App failed to compile.")
+
+    async def upload(self, workbook: Path):
+        """Upload a file the way the browser does and select it in the app's file uploader."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        from tornado.httpclient import AsyncHTTPClient
+
+        if self.session_id is None or self.uploader_id is None:
+            raise RuntimeError("Run the app once before uploading (no session or uploader yet).")
+        msg = BackMsg()
+        msg.file_urls_request.request_id = uuid.uuid4().hex
+        msg.file_urls_request.session_id = self.session_id
+        msg.file_urls_request.file_names.append(workbook.name)
+        await self._send(msg)
+        while True:
+            fwd = await self._receive()
+            if fwd.WhichOneof("type") == "file_urls_response" \
+                    and fwd.file_urls_response.response_id == msg.file_urls_request.request_id:
+                break
+        if fwd.file_urls_response.error_msg:
+            raise RuntimeError(f"Upload refused: {fwd.file_urls_response.error_msg}")
+        urls = fwd.file_urls_response.file_urls[0]
+
+        data = workbook.read_bytes()
+        boundary = uuid.uuid4().hex
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{urls.file_id}"; '
+                f'filename="{workbook.name}"\r\nContent-Type: {XLSX_MIME}\r\n\r\n').encode() \
+            + data + f"\r\n--{boundary}--\r\n".encode()
+        await AsyncHTTPClient().fetch(
+            f"http://127.0.0.1:{self.port}{urls.upload_url}", method="PUT", body=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            request_timeout=self.timeout)
+
+        state = WidgetState(id=self.uploader_id)
+        state.file_uploader_state_value.uploaded_file_info.add(
+            file_id=urls.file_id, name=workbook.name, size=len(data), file_urls=urls)
+        self.widget_states[self.uploader_id] = state
+
+    def change_filter(self, rnd):
+        """Pick one of FILTERS and set a random subset of its options."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        name = rnd.choice(FILTERS)
+        match = [(wid, options) for wid, (label, options) in self.multiselects.items()
+                 if wid.endswith(f"-{name}") or label == name]
+        if not match or not match[0][1]:
+            return
+        wid, options = match[0]
+        state = WidgetState(id=wid)
+        state.string_array_value.data.extend(rnd.sample(options, rnd.randint(0, len(options))))
+        self.widget_states[wid] = state
+
+
+class _StartGate:
+    """Releases all waiters once ``parties`` sessions have arrived (asyncio.Barrier needs Python 3.11)."""
+
+    def __init__(self, parties):
+        self.parties = parties
+        self.arrived = 0
+        self._open = asyncio.Event()
+
+    async def wait(self):
+        self.arrived += 1
+        if self.arrived >= self.parties:
+            self._open.set()
+        await self._open.wait()
+
+
+async def _session(port, workbook, steps, seed, barrier, timeout):
+    """One user: connect, upload, warm up, wait for all users, then ``steps`` timed filter changes.
+
+    Always returns a record; failures are reported in ``error`` instead of raised.
+    """
+    rnd = random.Random(seed)
+    record = {"latencies": [], "exceptions": 0, "error": None}
+    session = Session(port, timeout)
+    try:
+        try:
+            await session.connect()
+            await session.rerun()               # empty app: learn session and uploader ids
+            await session.upload(workbook)
+            await session.rerun()               # warm-up with the workbook, not timed
+        finally:
+            # Also on failure, so that the other sessions are not held up.
+            await asyncio.wait_for(barrier.wait(), timeout)
+        for _ in range(steps):
+            session.change_filter(rnd)
+            record["latencies"].append(await session.rerun())
+    except Exception as exc:
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        record["exceptions"] = session.exceptions
+        session.close()
+    return record
+
+
+async def _run_sessions(port, workbook, users, steps, seed, timeout):
+    barrier = _StartGate(users)
+    return await asyncio.gather(*[
+        _session(port, workbook, steps, seed + i, barrier, timeout) for i in range(users)
+    ])
+
+
+def run_level(server, workbook, users, steps, seed=0, timeout=120.0, sample_every=0.2):
+    """Run ``users`` concurrent sessions against ``server``; summarise rerun latency and server CPU / RSS."""
+    cpu0, rss0 = server.usage()
+    rss_peak = [rss0]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(sample_every):
+            rss_peak[0] = max(rss_peak[0], server.usage()[1])
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.perf_counter()
+    try:
+        out = asyncio.run(_run_sessions(server.port, workbook, users, steps, seed, timeout))
+    finally:
+        done.set()
+        sampler.join()
+    wall = time.perf_counter() - start
+    cpu1, rss1 = server.usage()
+
+    lat = np.array([t for r in out for t in r["latencies"]]) * 1000
+    pct = np.percentile(lat, [50, 95, 99]) if lat.size else [float("nan")] * 3
+    return {
+        "users": users,
+        "reruns": int(lat.size),
+        "errors": sum(r["exceptions"] for r in out) + sum(r["error"] is not None for r in out),
+        "failed_sessions": [r["error"] for r in out if r["error"] is not None],
+        "p50_ms": float(pct[0]),
+        "p95_ms": float(pct[1]),
+        "p99_ms": float(pct[2]),
+        "cpu_s": cpu1 - cpu0,
+        "cpu_cores": (cpu1 - cpu0) / wall,
+        "rss_start_mb": rss0,
+        "rss_peak_mb": max(rss_peak[0], rss1),
+        "wall_s": wall,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 5, 20, 50], help="concurrency levels")
+    parser.add_argument("--steps", type=int, default=10, help="timed filter changes per session")
+    parser.add_argument("--indicators", type=int, default=24, help="indicators in the generated workbook")
+    parser.add_argument("--workbook", type=Path, help="use this workbook instead of a generated one")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for any single reply")
+    parser.add_argument("--port", type=int, help="server port (default: a free one)")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = args.workbook
+        if workbook is None:
+            workbook = Path(tmp) / "loadtest.xlsx"
+            make_workbook(workbook, n_indicators=args.indicators, seed=args.seed)
+
+        header = f"{'users':>5} {'reruns':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} " \
+                 f"{'cores':>6} {'RSS MB':>7} {'peak MB':>7}"
+        rows = []
+        with Server(args.port or _free_port(), Path(tmp) / "server.log") as server:
+            print(f"server pid {server.proc.pid} on port {server.port}")
+            print(header)
+            for users in args.users:
+                r = run_level(server, workbook.resolve(), users, args.steps, seed=args.seed, timeout=args.timeout)
+                rows.append(r)
+                print(f"{r['users']:>5} {r['reruns']:>6} {r['errors']:>6} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} "
+                      f"{r['p99_ms']:>8.0f} {r['cpu_cores']:>6.2f} {r['rss_start_mb']:>7.0f} "
+                      f"{r['rss_peak_mb']:>7.0f}", flush=True)
+                for err in sorted(set(r["failed_sessions"])):
+                    print(f"      failed session: {err}", file=sys.stderr)
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,22 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import matplotlib.lines as mlines
 from itertools import groupby
 import streamlit as st
 import io
 from matplotlib import font_manager
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
+from matplotlib.figure import Figure
 
+
+from dashboard.cache import shared_cache, frame_hash
 from dashboard.constants import NUMBER_TO_GRAY, DIM_COLORS, LEVEL_MAP_FRAC, LEVEL_MAP_ORD
 from dashboard.utils import wrap_text
 
+PEER_COLOR = "#139e8b"
+
     
 
 def polar_base(categories, dim_map):#, fp_bold, fp_reg):
@@ -22,7 +28,8 @@ def polar_base(categories, dim_map):#, fp_bold, fp_reg):
     dim_sequence = [dim_map[c] for c in categories]
     dim_segments = [(d, sum(1 for _ in grp)) for d, grp in groupby(dim_sequence)]
 
-    fig = plt.figure(figsize=(9,9), dpi=150)
+    # Figure instead of plt.figure: not tracked by pyplot, so it can be rendered off the main thread
+    fig = Figure(figsize=(9,9), dpi=150)
     ax = fig.add_subplot(111, projection="polar")
     ax.set_theta_zero_location("N")
     ax.set_theta_direction(-1)
@@ -66,28 +73,73 @@ def polar_base(categories, dim_map):#, fp_bold, fp_reg):
                 rotation=ang_deg, ha="center", va="center", fontsize=7, fontweight="bold")
     return fig, ax, angles, sector_w
 
-def _draw_questions(ax, df, cat, theta, sector_w):
+def _fig_png(fig) -> bytes:
+    """Render the high-resolution PNG used for downloads and report bundles."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=600, bbox_inches="tight", pad_inches=0.05)
+    return buf.getvalue()
+
+def _cells(df, rows, values):
+    """Map (indicator, level) -> first value among the selected rows, without copying the frame."""
+    if rows is None:
+        rows = np.ones(len(df), dtype=bool)
+    rows = np.asarray(rows, dtype=bool)
+    out = {}
+    for key, val in zip(zip(df["INDICATOR | 指标"].to_numpy()[rows], df["LEVEL"].to_numpy()[rows]),
+                        np.asarray(values)[rows]):
+        out.setdefault(key, val)
+    return out
+
+def _categories(df, rows):
+    """Indicators (in order) and their dimensions among the selected rows."""
+    ind = df["INDICATOR | 指标"] if rows is None else df["INDICATOR | 指标"][rows]
+    dim = df["DIMENSION | 维度"] if rows is None else df["DIMENSION | 维度"][rows]
+    return ind.unique().tolist(), dict(zip(ind, dim))
+
+def _mask_key(*masks):
+    return tuple(None if m is None else np.packbits(np.asarray(m, dtype=bool)).tobytes() for m in masks)
+
+def _draw_questions(ax, numbers, cat, theta, sector_w):
     for level in range(1,5):
-        q = df.loc[(df["INDICATOR | 指标"]==cat) & (df["LEVEL"]==level), "NUMBER | 编号"].values
-        if len(q): ax.text(theta+sector_w/2, level-0.2, wrap_text(q[0], 20),
-                           ha="center", va="center", fontsize=5, color="black")
+        q = numbers.get((cat, level))
+        if q is not None: ax.text(theta+sector_w/2, level-0.2, wrap_text(q, 20),
+                                  ha="center", va="center", fontsize=5, color="black")
+
+def _draw_peer_bands(ax, bands, cats, angles, sector_w):
+    """Overlay peer P25–P75 band and median per indicator (ring units 0..4)."""
+    bands = bands.set_index("indicator")
+    for i, cat in enumerate(cats):
+        if str(cat) not in bands.index:
+            continue
+        b = bands.loc[str(cat)]
+        th = np.linspace(angles[i], angles[i] + sector_w, 20)
+        ax.fill_between(th, b["p25"], b["p75"], color=PEER_COLOR, alpha=0.35, linewidth=0, zorder=3)
+        ax.plot(th, np.full_like(th, b["p50"]), color=PEER_COLOR, linewidth=1.5, zorder=4)
+
+def maturity_png_key(df, rows=None, shown=None, bands=None):
+    return ("maturity_png", frame_hash(df), *_mask_key(rows, shown),
+            None if bands is None else frame_hash(bands))
 
-def plot_maturity(df):#, fp_bold, fp_reg):
+def maturity_figure(df, rows=None, shown=None, bands=None):#, fp_bold, fp_reg):
+    """Maturity ring over ``df[rows]``; responses outside ``shown`` are drawn as unanswered.
+
+    ``df`` is not modified. Optional ``bands`` (benchmark.indicator_bands) draws peer percentile bands.
+    """
     # plt.rcParams['font.sans-serif'] = ['SimHei']   
     plt.rcParams['axes.unicode_minus'] = False     
 
-    dim_map = dict(zip(df["INDICATOR | 指标"], df["DIMENSION | 维度"]))
-    cats = df["INDICATOR | 指标"].unique().tolist()
+    cats, dim_map = _categories(df, rows)
     fig, ax, angles, sector_w = polar_base(cats, dim_map)#, fp_bold, fp_reg)
 
-    df["RESPONSE_NUMBER"] = (df["RESPONSE_NUMBER"].fillna(-1).astype(int))
+    resp = df["RESPONSE_NUMBER"] if shown is None else df["RESPONSE_NUMBER"].where(shown, -1)
+    cells = _cells(df, rows, resp.fillna(-1).astype(int))
+    numbers = _cells(df, rows, df["NUMBER | 编号"])
 
     GRAY_SCALE = 0.8
     for i, cat in enumerate(cats):
         th = angles[i]
         for level in range(1,5):
-            vals = df.loc[(df["INDICATOR | 指标"]==cat) & (df["LEVEL"]==level), "RESPONSE_NUMBER"].values
-            val = int(vals[0]) if len(vals) else 0
+            val = int(cells.get((cat, level), 0))
             if val == 0:   color = "#FFF064"
             elif val == -1: color = "white"
             elif val == 99: color = "#d9c7a1" 
@@ -95,7 +147,10 @@ def plot_maturity(df):#, fp_bold, fp_reg):
             else:          color = str(1 - NUMBER_TO_GRAY.get(val,0.0)*GRAY_SCALE)
             ax.bar(th, 1, width=sector_w, bottom=level-1, align="edge",
                    color=color, edgecolor="black", linewidth=0.5)
-        _draw_questions(ax, df, cat, th, sector_w)
+        _draw_questions(ax, numbers, cat, th, sector_w)
+
+    if bands is not None and len(bands):
+        _draw_peer_bands(ax, bands, cats, angles, sector_w)
 
     base_legend = [
         #mpatches.Patch(color="#E8E8E8", label="Not implemented yet | 尚未实施 "),
@@ -110,7 +165,11 @@ def plot_maturity(df):#, fp_bold, fp_reg):
         "Don't know | 不知道":   ("#FFF064", "Don't know | 不知道"),
     }
 
-    available = set(df["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].unique())
+    curr = df["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"]
+    sel = np.ones(len(df), dtype=bool) if rows is None else np.asarray(rows, dtype=bool)
+    if shown is not None:
+        sel = sel & np.asarray(shown, dtype=bool)
+    available = set(curr[sel].unique())
     optional_legend = [
         mpatches.Patch(color=color, label=label)
         for key, (color, label) in optional_map.items()
@@ -118,6 +177,11 @@ def plot_maturity(df):#, fp_bold, fp_reg):
     ]
 
     legend_handles = base_legend + optional_legend
+    if bands is not None and len(bands):
+        legend_handles += [
+            mpatches.Patch(color=PEER_COLOR, alpha=0.35, label="Peers P25–P75 | 同行 P25–P75"),
+            mlines.Line2D([], [], color=PEER_COLOR, linewidth=1.5, label="Peer median | 同行中位数"),
+        ]
 
     #fontP = font_manager.FontProperties(family='SimHei')  # optional: size=7
 
@@ -140,42 +204,50 @@ def plot_maturity(df):#, fp_bold, fp_reg):
     #leg.get_frame().set_edgecolor("gray")
 
     leg.get_frame().set_linewidth(0.8)
+    return fig
+
+def maturity_png(df, rows=None, shown=None, bands=None) -> bytes:
+    """Download PNG of the maturity ring, rendered once per inputs and shared via the cache."""
+    return shared_cache.get_or_compute(maturity_png_key(df, rows, shown, bands),
+                                       lambda: _fig_png(maturity_figure(df, rows, shown, bands)))
 
+def plot_maturity(df, rows=None, shown=None, bands=None):
+    fig = maturity_figure(df, rows, shown, bands)
     st.pyplot(fig)#, use_container_width=True)
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=600, bbox_inches="tight", pad_inches=0.05)
-    buf.seek(0)
+    png = shared_cache.get_or_compute(maturity_png_key(df, rows, shown, bands), _fig_png, fig)
 
     st.download_button(
         label="💾 Download figure",
-        data=buf,
+        data=png,
         file_name="maturity_results.png",
         mime="image/png"
     )
-    fig.savefig("maturity_results_local.png", dpi=600, bbox_inches="tight", pad_inches=0.05)
 
-def plot_gap(df1):#, fp_bold, fp_reg):
+def gap_png_key(df1, rows=None, shown=None):
+    return ("gap_png", frame_hash(df1), *_mask_key(rows, shown))
+
+def gap_figure(df1, rows=None, shown=None):#, fp_bold, fp_reg):
+    """Gap ring over ``df1[rows]``; gaps outside ``shown`` are drawn as no action. ``df1`` is not modified."""
 
-    dim_map = dict(zip(df1["INDICATOR | 指标"], df1["DIMENSION | 维度"]))
-    cats = df1["INDICATOR | 指标"].unique().tolist()
+    cats, dim_map = _categories(df1, rows)
     fig, ax, angles, sector_w = polar_base(cats, dim_map)#, fp_bold=fp_bold, fp_reg=fp_reg)
 
-    df1["RESPONSE_NUMBER"] = (df1["RESPONSE_NUMBER"].fillna(-1).astype(int)
-                             )
-    
+    diff = df1["DIFF"] if shown is None else df1["DIFF"].where(shown, 0)
+    cells = _cells(df1, rows, diff)
+    numbers = _cells(df1, rows, df1["NUMBER | 编号"])
+
     for i, cat in enumerate(cats):
         th = angles[i]
         for level in range(1,5):
-            vals = df1.loc[(df1["INDICATOR | 指标"]==cat) & (df1["LEVEL"]==level), "DIFF"].values
-            val = int(vals[0]) if len(vals) else 0
+            val = int(cells.get((cat, level), 0))
             if val == 3: color = "#745995" 
             elif val == 2: color = "#AE9CC4"
             elif val == 1: color = "#E4DFEC"
             else:          color = 'white'
             ax.bar(th, 1, width=sector_w, bottom=level-1, align="edge",
                    color=color, edgecolor="black", linewidth=0.5)
-        _draw_questions(ax, df1, cat, th, sector_w)
+        _draw_questions(ax, numbers, cat, th, sector_w)
  
     legend = [
         mpatches.Patch(color="white",   label="No action required | 无需采取任何行动"),
@@ -199,17 +271,22 @@ def plot_gap(df1):#, fp_bold, fp_reg):
         edgecolor="gray",
     )
     leg.get_frame().set_linewidth(0.8)
+    return fig
+
+def gap_png(df1, rows=None, shown=None) -> bytes:
+    """Download PNG of the gap ring, rendered once per inputs and shared via the cache."""
+    return shared_cache.get_or_compute(gap_png_key(df1, rows, shown),
+                                       lambda: _fig_png(gap_figure(df1, rows, shown)))
 
+def plot_gap(df1, rows=None, shown=None):
+    fig = gap_figure(df1, rows, shown)
     st.pyplot(fig, dpi=600)
 
-    buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=600, bbox_inches="tight", pad_inches=0.05)
-    buf.seek(0)
+    png = shared_cache.get_or_compute(gap_png_key(df1, rows, shown), _fig_png, fig)
 
     st.download_button(
         label="💾 Download figure",
-        data=buf,
+        data=png,
         file_name="gap_analysis.png",
         mime="image/png"
     )
-    fig.savefig("gap_analysis_local.png", dpi=600, bbox_inches="tight", pad_inches=0.05)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""Full report bundle (all figures and tables as one ZIP) built by a background job.
+
+Jobs run in a small process-wide thread pool and are keyed by a hash of the workbook and the
+current filters, so the same bundle is built only once and shared by all sessions. Artifacts are
+rendered one at a time and written straight into a ZIP file on disk.
+"""
+import hashlib
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+from dashboard.alignment import alignment_frame, scatter_png, priorities_table, priorities_xlsx
+from dashboard.cache import frame_hash
+from dashboard.constants import REPORT_DIR, REPORT_KEEP, REPORT_WORKERS
+from dashboard.plots import maturity_png, gap_png
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+_jobs = {}
+_lock = threading.RLock()
+
+
+class ReportJob:
+    def __init__(self, key: str, path: Path):
+        self.key = key
+        self.path = path
+        self.state = "queued"      # queued -> running -> done | failed
+        self.progress = 0.0
+        self.status = "Waiting for a free worker…"
+        self.error = None
+
+
+def report_key(file_hash: str, maturity_masks, gap_masks, goals, bands=None) -> str:
+    """Hash of everything a bundle depends on: workbook content, filters, goals and peer bands."""
+    h = hashlib.sha256(file_hash.encode())
+    for mask in (*maturity_masks, *gap_masks):
+        h.update(b"-" if mask is None else np.packbits(np.asarray(mask, dtype=bool)).tobytes())
+        h.update(b"|")
+    h.update(repr(list(goals or [])).encode("utf-8"))
+    h.update(b"-" if bands is None else frame_hash(bands).encode())
+    return h.hexdigest()[:32]
+
+
+def get_job(key: str):
+    """Running or finished job for key; bundles already on disk count as finished."""
+    with _lock:
+        job = _jobs.get(key)
+        if job is None:
+            path = Path(REPORT_DIR) / f"report_{key}.zip"
+            if path.exists():
+                job = _jobs[key] = ReportJob(key, path)
+                job.state, job.progress, job.status = "done", 1.0, "Report ready."
+        return job
+
+
+def start_report(key: str, df_1, df_3, maturity_masks, gap_masks, goals, bands=None) -> ReportJob:
+    """Submit a bundle job unless one for the same inputs is already running or finished.
+
+    Frames and masks are only read, never modified, so they can be shared with the worker thread.
+    """
+    Path(REPORT_DIR).mkdir(parents=True, exist_ok=True)
+    with _lock:
+        job = get_job(key)
+        if job is not None and job.state != "failed":
+            return job
+        job = _jobs[key] = ReportJob(key, Path(REPORT_DIR) / f"report_{key}.zip")
+    _executor.submit(_build, job, df_1, df_3, maturity_masks, gap_masks, goals, bands)
+    return job
+
+
+def _build(job, df_1, df_3, maturity_masks, gap_masks, goals, bands):
+    job.state = "running"
+    part = job.path.with_suffix(".part")
+    try:
+        steps = [
+            ("maturity_results.png", lambda: maturity_png(df_1, *maturity_masks, bands=bands)),
+            ("gap_analysis.png", lambda: gap_png(df_1, *gap_masks)),
+        ]
+        align = alignment_frame(df_1, df_3, goals)
+        if align is not None:
+            steps += [
+                ("alignment_scatter.png", lambda: scatter_png(align, goals)),
+                ("priorities.xlsx", lambda: priorities_xlsx(priorities_table(df_1, align, goals))),
+            ]
+
+        # PNG and XLSX are already compressed, so entries are stored as-is.
+        with zipfile.ZipFile(part, "w", compression=zipfile.ZIP_STORED) as zf:
+            for i, (name, render) in enumerate(steps):
+                job.status = f"Rendering {name} ({i + 1}/{len(steps)})…"
+                zf.writestr(name, render())
+                job.progress = (i + 1) / len(steps)
+        part.replace(job.path)
+    except Exception as exc:
+        part.unlink(missing_ok=True)
+        job.state, job.error = "failed", exc
+        return
+    job.state, job.status = "done", "Report ready."
+    _prune()
+
+
+def _prune():
+    """Keep only the REPORT_KEEP most recently built bundles on disk."""
+    bundles = sorted(Path(REPORT_DIR).glob("report_*.zip"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in bundles[REPORT_KEEP:]:
+        with _lock:
+            _jobs.pop(path.stem.removeprefix("report_"), None)
+        path.unlink(missing_ok=True)
+
+
+def _poll(key):
+    job = get_job(key)
+    if job is None or job.state in ("done", "failed"):
+        st.rerun()
+    st.progress(job.progress, text=job.status)
+
+
+def _forget(key):
+    with _lock:
+        _jobs.pop(key, None)
+
+
+def report_panel(key: str, start) -> None:
+    """Build/download buttons with progress; ``start()`` submits the job for the current inputs."""
+    job = get_job(key)
+    if job is not None and job.state == "done":
+        try:
+            with open(job.path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            # Pruned between get_job and open: the bundle is gone, offer to build it again.
+            _forget(key)
+            job = None
+        else:
+            st.download_button(
+                label="💾 Download full report",
+                data=data,
+                file_name="report.zip",
+                mime="application/zip",
+                key="report_download",
+            )
+            return
+
+    if job is None or job.state == "failed":
+        if job is not None:
+            st.error(f"Report failed: {job.error}")
+        if not st.button("📦 Build full report", key="report_build"):
+            return
+        job = start()
+
+    if job.state in ("queued", "running"):
+        st.fragment(run_every=1.0)(_poll)(key)
+    else:
+        st.rerun()   # finished by another session in the meantime
@@ -0,0 +1,129 @@
+"""Vectorized what-if engine for measure prioritization.
+
+A measure is an assessment question whose implementation level can be raised. Its value
+in a scenario is the number of levels it is raised (gain) times the utility of its
+indicator for the strategic goals, weighted by the scenario's goal weights::
+
+    score[s, q] = gain[s, q] * (goal_weights[s] @ utility[indicator[q]])
+
+Scenarios are scored as one (S, Q) array, so thousands of target-level / goal-weight
+combinations can be evaluated per slider change.
+"""
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+COL_IND  = "INDICATOR | 指标"
+COL_NUM  = "NUMBER | 编号"
+COL_QTXT = "ASSESSMENT QUESTION | 评估问题 "
+
+
+class ScenarioData(NamedTuple):
+    questions: pd.DataFrame   # one row per measure (number, question text, indicator, LEVEL)
+    current: np.ndarray       # (Q,) current implementation level 1..4
+    target: np.ndarray        # (Q,) target level from the workbook 1..4 ("workbook targets" scenario)
+    level: np.ndarray         # (Q,) maturity level of the question 1..4
+    q_ind: np.ndarray         # (Q,) row of the question's indicator in utility
+    utility: np.ndarray       # (I, G) contribution of each indicator to each goal
+    goals: list
+
+
+def build_scenario_data(qg: pd.DataFrame, overview: pd.DataFrame, goal_cols: list) -> ScenarioData:
+    """Convert ``compute_question_gaps`` output and Overview goal fractions into arrays.
+
+    ``overview`` needs the indicator column plus ``goal_cols`` already converted to fractions.
+    Questions rated "Not relevant" and questions of indicators missing in the Overview are dropped;
+    "Don't know" and empty answers count as not implemented.
+    """
+    ov = (overview.assign(_KEY=overview[COL_IND].astype(str).str.strip())
+                  .drop_duplicates(subset="_KEY")
+                  .reset_index(drop=True))
+    ind_pos = pd.Series(np.arange(len(ov)), index=ov["_KEY"])
+
+    resp = pd.to_numeric(qg["RESPONSE_NUMBER"], errors="coerce")
+    q_ind = qg[COL_IND].astype(str).str.strip().map(ind_pos)
+    keep = (resp != 99) & q_ind.notna()
+
+    q = qg.loc[keep].reset_index(drop=True)
+    current = resp[keep].where(resp[keep].between(1, 4), 1).to_numpy(dtype=np.int8)
+    targ = pd.to_numeric(q["TARGET_NUMBER"], errors="coerce")
+    target = targ.where(targ.between(1, 4), pd.Series(current)).to_numpy(dtype=np.int8)
+    utility = ov[goal_cols].to_numpy(dtype=float) if goal_cols else np.zeros((len(ov), 0))
+
+    return ScenarioData(
+        questions=q[[c for c in [COL_NUM, COL_QTXT, COL_IND, "LEVEL"] if c in q.columns]],
+        current=current,
+        target=target,
+        level=pd.to_numeric(q["LEVEL"], errors="coerce").fillna(4).to_numpy(dtype=np.int8),
+        q_ind=q_ind[keep].to_numpy(dtype=np.intp),
+        utility=np.nan_to_num(utility),
+        goals=list(goal_cols),
+    )
+
+
+def targets_for_levels(data: ScenarioData, levels) -> np.ndarray:
+    """Target matrix (S, Q) for target maturity levels given per scenario (S,) or per scenario and indicator (S, I).
+
+    Reaching maturity level L means fully implementing every question up to level L;
+    questions above L keep their current level.
+    """
+    levels = np.asarray(levels)
+    per_q = levels[:, None] if levels.ndim == 1 else levels[:, data.q_ind]
+    return np.where(data.level[None, :] <= per_q, 4, data.current[None, :]).astype(np.int8)
+
+
+def score_scenarios(data: ScenarioData, targets, goal_weights):
+    """Score S scenarios in one pass. Returns ``(score, gain)``, both (S, Q)."""
+    targets = np.broadcast_to(np.asarray(targets), (len(goal_weights), len(data.current)))
+    gain = np.clip(targets - data.current[None, :], 0, None).astype(float)
+    q_util = data.utility[data.q_ind]                      # (Q, G)
+    util = np.asarray(goal_weights, dtype=float) @ q_util.T   # (S, Q)
+    return gain * util, gain
+
+
+def select_under_budget(score, effort, budget):
+    """Greedy measure selection per scenario by value per effort, within ``budget``.
+
+    Measures are visited in order of decreasing value per effort and taken whenever they still
+    fit; a measure that does not fit is skipped, not the end of the selection. The loop runs over
+    the Q measures, each step vectorized over all scenarios.
+    Returns a boolean (S, Q) selection and the total value per scenario.
+    """
+    effort = np.broadcast_to(effort, score.shape)
+    useful = (score > 0) & (effort > 0)
+    density = np.where(useful, score / np.where(effort > 0, effort, 1), -np.inf)
+    order = np.argsort(-density, axis=1, kind="stable")
+    eff_sorted = np.take_along_axis(effort, order, axis=1)
+    useful_sorted = np.take_along_axis(useful, order, axis=1)
+
+    remaining = np.full(score.shape[0], float(budget))
+    take_sorted = np.zeros(score.shape, dtype=bool)
+    for j in range(score.shape[1]):
+        ok = useful_sorted[:, j] & (eff_sorted[:, j] <= remaining)
+        remaining -= np.where(ok, eff_sorted[:, j], 0.0)
+        take_sorted[:, j] = ok
+
+    selected = np.zeros(score.shape, dtype=bool)
+    np.put_along_axis(selected, order, take_sorted, axis=1)
+    return selected, np.where(selected, score, 0.0).sum(axis=1)
+
+
+def top_k(values, k):
+    """Indices of the k largest entries along the last axis, best first (argpartition + small sort)."""
+    values = np.asarray(values)
+    k = min(k, values.shape[-1])
+    if k <= 0:
+        return np.empty(values.shape[:-1] + (0,), dtype=np.intp)
+    part = np.argpartition(-values, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(values, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+def sample_scenarios(data: ScenarioData, n: int, rng=None):
+    """Random scenario batch: per-indicator target levels (n, I) and Dirichlet goal weights (n, G)."""
+    rng = np.random.default_rng(rng)
+    n_ind, n_goals = data.utility.shape
+    levels = rng.integers(1, 5, size=(n, n_ind))
+    weights = rng.dirichlet(np.ones(n_goals), size=n) if n_goals else np.zeros((n, 0))
+    return levels, weights
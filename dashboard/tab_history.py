@@ -0,0 +1,69 @@
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from dashboard import history
+from dashboard.cache import content_hash
+
+
+def render_history(df_1: pd.DataFrame, file_obj) -> None:
+    """Ingest the current workbook once and show indicator trajectories over time."""
+    st.subheader("Add this assessment to the history")
+    c1, c2, c3 = st.columns([3, 2, 1])
+    with c1:
+        org = st.text_input("Organisation:", key="hist_org")
+    with c2:
+        assessed_on = st.date_input("Assessment date:", value=date.today(), key="hist_date")
+    with c3:
+        st.write("")
+        add = st.button("Add to history", disabled=not org.strip(), key="hist_add")
+    if add:
+        _, created = history.ingest(df_1, content_hash(file_obj), org, assessed_on)
+        if created:
+            st.success(f"Added {file_obj.name} to the history of {org.strip()}.")
+        else:
+            st.info("This workbook is already part of the history.")
+
+    orgs = history.organisations()
+    if not orgs:
+        st.caption("No assessments stored yet.")
+        return
+
+    st.subheader("Trends per indicator")
+    default = orgs.index(org.strip()) if org.strip() in orgs else 0
+    sel_org = st.selectbox("Organisation:", orgs, index=default, key="hist_sel_org")
+    trends = history.indicator_trends(sel_org)
+    if trends.empty:
+        st.caption("No assessments stored yet.")
+        return
+
+    indicators = trends["indicator"].unique().tolist()
+    sel_inds = st.multiselect("Filter indicators:", options=indicators, default=None, key="hist_inds")
+    if sel_inds:
+        trends = trends[trends["indicator"].isin(sel_inds)]
+
+    metric = st.radio("Metric:", ["Maturity", "Gap"], horizontal=True, key="hist_metric")
+    col = "maturity" if metric == "Maturity" else "gap"
+    st.line_chart(trends.pivot(index="quarter", columns="indicator", values=col))
+
+    latest = (trends.sort_values("assessed_on")
+                    .groupby("indicator", sort=False).tail(1)
+                    .sort_values("maturity_delta", na_position="last"))
+    st.subheader("Change to previous quarter")
+    st.dataframe(
+        latest[["dimension", "indicator", "quarter", "maturity", "maturity_delta", "gap", "gap_delta"]]
+        .rename(columns={
+            "dimension": "Dimension", "indicator": "Indicator", "quarter": "Quarter",
+            "maturity": "Maturity", "maturity_delta": "Δ Maturity", "gap": "Gap", "gap_delta": "Δ Gap",
+        }),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Maturity": st.column_config.NumberColumn(format="percent"),
+            "Δ Maturity": st.column_config.NumberColumn(format="percent"),
+            "Gap": st.column_config.NumberColumn(format="%.2f"),
+            "Δ Gap": st.column_config.NumberColumn(format="%+.2f"),
+        },
+    )
+
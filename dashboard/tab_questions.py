@@ -1,11 +1,11 @@
 import html
 import streamlit as st
 
-def render_questions_table(df):
+def render_questions_table(df, rows=None):
 
     """Render NUMBER + ASSESSMENT QUESTION mit sauber ausgerichteten Trennlinien (CSS Grid, unique classes)."""
     cols = [c for c in ["NUMBER | 编号", "ASSESSMENT QUESTION | 评估问题 "] if c in df.columns]
-    view = df[cols].dropna(subset=["NUMBER | 编号"]).sort_values(
+    view = (df[cols] if rows is None else df.loc[rows, cols]).dropna(subset=["NUMBER | 编号"]).sort_values(
         ["NUMBER | 编号"], ignore_index=True
     )
 
@@ -1,21 +1,71 @@
 import streamlit as st
-from dashboard.constants import RESPONSE_TO_NUMBER, LEVEL_MAP_ORD
+from dashboard import benchmark
+from dashboard.cache import shared_cache
+from dashboard.constants import ACTION_BUCKETS, RESPONSE_TO_NUMBER
+from dashboard.data_io import inspect_workbook, WorkbookRejected
 import pandas as pd
 
+def _upload_key(f):
+    return getattr(f, "file_id", None) or f.name
+
+def _upload_problem(f):
+    """Guardrail check of one upload, run once per file and session; None if accepted."""
+    checked = st.session_state.setdefault("_upload_checks", {})
+    key = _upload_key(f)
+    if key not in checked:
+        try:
+            inspect_workbook(f)
+            checked[key] = None
+        except WorkbookRejected as exc:
+            checked[key] = str(exc)
+    return checked[key]
+
 def file_uploader_left():
-    """Left column uploader + file picker."""
+    """Left column uploader + file picker; workbooks failing the guardrails are listed as errors."""
     uploaded_files = st.file_uploader(label="Upload Excel file", type=["xlsx"], accept_multiple_files=True, label_visibility="collapsed")
+    # Forget check results of files that were removed from the uploader
+    checked = st.session_state.get("_upload_checks", {})
+    current = {_upload_key(f) for f in uploaded_files or []}
+    for key in [k for k in checked if k not in current]:
+        del checked[key]
+    if not uploaded_files:
+        return None
+    accepted = []
+    for f in uploaded_files:
+        problem = _upload_problem(f)
+        if problem:
+            st.error(f"{f.name}: {problem}")
+        else:
+            accepted.append(f)
+    uploaded_files = accepted
     if not uploaded_files:
         return None
     names = [f.name for f in uploaded_files]
     chosen = st.selectbox("Select a file:", names)
     return next(f for f in uploaded_files if f.name == chosen)
 
+def cache_stats_panel():
+    """Hit/miss/eviction counters of the process-wide cache (for instance sizing)."""
+    stats = shared_cache.stats()
+    with st.expander("Server cache", expanded=False):
+        st.caption(
+            f"{stats['entries']} entries · "
+            f"{stats['size_bytes'] / 2**20:.1f} / {stats['budget_bytes'] / 2**20:.0f} MB"
+        )
+        st.caption(
+            f"Hits: {stats['hits']} · Misses: {stats['misses']} · "
+            f"Evictions: {stats['evictions']} · Hit rate: {stats['hit_rate']:.0%}"
+        )
+
 def pills_filters(df, key_prefix=""):
-    out = df.copy().dropna(subset=["NUMBER | 编号"])
+    """Maturity filters. Returns boolean masks over ``df``: ``(rows, shown)``.
+
+    ``rows`` selects the questions to draw, ``shown`` the responses to keep (others are drawn unanswered).
+    """
+    rows = df["NUMBER | 编号"].notna()
 
-    responses  = out["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].dropna().unique().tolist()
-    dimensions = out["DIMENSION | 维度"].dropna().unique().tolist()
+    responses  = df.loc[rows, "CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].dropna().unique().tolist()
+    dimensions = df.loc[rows, "DIMENSION | 维度"].dropna().unique().tolist()
 
     c1, c2 = st.columns(2)
     with c1:
@@ -33,58 +83,28 @@ def pills_filters(df, key_prefix=""):
             key=f"{key_prefix}_dims"
         )
 
+    shown = pd.Series(True, index=df.index)
     if sel_resp and len(sel_resp) < len(responses):
-        out.loc[~out["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].isin(sel_resp), "CURRENT IMPLEMENTATION LEVEL | 当前实施水平"] = "None"
+        shown = df["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].isin(sel_resp)
 
     if sel_dims and len(sel_dims) < len(dimensions):
-        out = out[out["DIMENSION | 维度"].isin(sel_dims)]
+        rows = rows & df["DIMENSION | 维度"].isin(sel_dims)
 
-    out["RESPONSE_NUMBER"] = out["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].map(RESPONSE_TO_NUMBER)
-    return out
+    return rows, shown
 
 def gap_filters(df1, key_prefix="gap"):
+    """Gap filters. Returns boolean masks over ``df1``: ``(rows, shown)``.
 
-    out = df1.copy()
-    out = out.sort_values(by="NUMBER | 编号").reset_index(drop=True).dropna(subset=["NUMBER | 编号"])
-    if "RESPONSE_NUMBER" not in out.columns:
-        out["RESPONSE_NUMBER"] = out["CURRENT IMPLEMENTATION LEVEL | 当前实施水平"].map(RESPONSE_TO_NUMBER)
-
-    if "TARGET_NUMBER" not in out.columns:
-        out["TARGET_NUMBER"] = out["TARGET IMPLEMENTATION LEVEL | 目标实施层级"].map(RESPONSE_TO_NUMBER)
-
-    out["DIFF"] = pd.to_numeric(out["TARGET_NUMBER"], errors="coerce").fillna(0) \
-                - pd.to_numeric(out["RESPONSE_NUMBER"], errors="coerce").fillna(0)
-
-    if "BUCKET" not in out.columns:
-        def _bucket(row):
-            val = row.get("DIFF")
-            try:
-                val = int(val)
-            except Exception:
-                val = -1
-            if val == 1:
-                return "Limited action required | 仅需采取有限行动"
-            if val == 2:
-                return "Significant action required | 需要采取重大行动"
-            if val == 3:
-                return "Extensive action required | 需要采取广泛行动"
-            return "No action required | 无需采取任何行动"
-
-        out["BUCKET"] = out.apply(_bucket, axis=1)
-
-    buckets = [
-        "No action required | 无需采取任何行动",
-        "Limited action required | 仅需采取有限行动",
-        "Significant action required | 需要采取重大行动",
-        "Extensive action required | 需要采取广泛行动",
-    ]
-    dimensions = out["DIMENSION | 维度"].dropna().unique().tolist()
+    ``rows`` selects the questions to draw, ``shown`` the action categories to keep (others count as no action).
+    """
+    rows = df1["NUMBER | 编号"].notna()
+    dimensions = df1.loc[rows, "DIMENSION | 维度"].dropna().unique().tolist()
 
     c1, c2 = st.columns(2)
     with c1:
         sel_buckets = st.multiselect(
             "Show action categories:",
-            options=buckets,
+            options=ACTION_BUCKETS,
             default=None,
             key=f"{key_prefix}_buckets"
         )
@@ -96,20 +116,18 @@ def gap_filters(df1, key_prefix="gap"):
             key=f"{key_prefix}_dims"
         )
 
-    if sel_buckets and len(sel_buckets) < len(buckets):
-        out.loc[~out["BUCKET"].isin(sel_buckets), "DIFF"] = 0
-    # if sel_buckets and len(sel_buckets) < len(buckets):
-    #     out.loc[~out["BUCKET"].isin(sel_buckets), "BUCKET"] = "HIDE"
+    shown = pd.Series(True, index=df1.index)
+    if sel_buckets and len(sel_buckets) < len(ACTION_BUCKETS):
+        shown = df1["BUCKET"].isin(sel_buckets)
 
     if sel_dims and len(sel_dims) < len(dimensions):
-        out = out[out["DIMENSION | 维度"].isin(sel_dims)]
+        rows = rows & df1["DIMENSION | 维度"].isin(sel_dims)
 
-    return out
+    return rows, shown
 
 def dim_ind_filters(df, key_prefix=""):
-    out = df.copy()
-
-    dims_all = sorted(out["DIMENSION | 维度"].dropna().unique().tolist())
+    """Dimension/indicator filters. Returns a boolean row mask over ``df``."""
+    dims_all = sorted(df["DIMENSION | 维度"].dropna().unique().tolist())
 
     c1, c2 = st.columns(2)
     with c1:
@@ -120,8 +138,8 @@ def dim_ind_filters(df, key_prefix=""):
             key=f"{key_prefix}_dims"
         )
 
-    inds_source = out[out["DIMENSION | 维度"].isin(sel_dims)] if sel_dims else out
-    inds_all = sorted(inds_source["INDICATOR | 指标"].dropna().unique().tolist())
+    in_dims = df["DIMENSION | 维度"].isin(sel_dims) if sel_dims else pd.Series(True, index=df.index)
+    inds_all = sorted(df.loc[in_dims, "INDICATOR | 指标"].dropna().unique().tolist())
 
     with c2:
         sel_inds = st.multiselect(
@@ -131,9 +149,30 @@ def dim_ind_filters(df, key_prefix=""):
             key=f"{key_prefix}_inds"
         )
 
+    rows = pd.Series(True, index=df.index)
     if sel_dims and len(sel_dims) < len(dims_all):
-        out = out[out["DIMENSION | 维度"].isin(sel_dims)]
+        rows = in_dims
     if sel_inds and len(sel_inds) < len(inds_all):
-        out = out[out["INDICATOR | 指标"].isin(sel_inds)]
+        rows = rows & df["INDICATOR | 指标"].isin(sel_inds)
+
+    return rows
 
-    return out
+
+def peer_bands_toggle(key_prefix=""):
+    """Checkbox to overlay peer percentile bands; returns the bands or None."""
+    n = benchmark.corpus_size()
+    if not n:
+        return None
+    if not st.toggle(f"Compare with peers ({n} assessments)", key=f"{key_prefix}_peers"):
+        return None
+
+    with st.expander("Peer distribution per level", expanded=False):
+        labels = {v: k.strip() for k, v in RESPONSE_TO_NUMBER.items() if isinstance(k, str) and k != "nan"}
+        labels[-1] = "No answer"
+        shares = benchmark.level_shares().rename(columns=labels)
+        st.dataframe(
+            shares,
+            use_container_width=True,
+            column_config={c: st.column_config.NumberColumn(format="percent") for c in shares.columns},
+        )
+    return benchmark.indicator_bands()
@@ -0,0 +1,72 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard import benchmark
+from dashboard.history import COL_CURR, COL_IND
+
+NOT_YET = "Not implemented yet | 尚未实施 "
+FULLY = "Fully implemented | 全面实施"
+
+
+def _workbook(answers):
+    """Minimal parsed Sheet 1: one indicator "A" with levels 1..len(answers)."""
+    return pd.DataFrame({
+        COL_IND: ["A"] * len(answers),
+        COL_CURR: answers,
+        "LEVEL": np.arange(1, len(answers) + 1),
+    })
+
+
+def test_weighted_percentiles():
+    values = np.array([0.0, 1.0, 2.0, 3.0])
+    counts = np.array([1, 1, 1, 1])
+    assert benchmark._weighted_percentiles(values, counts, [25, 50, 75, 100]) == [0.0, 1.0, 2.0, 3.0]
+    # Counts act as repeated observations: 0, 2, 2, 2
+    assert benchmark._weighted_percentiles(np.array([0.0, 2.0]), np.array([1, 3]), [25, 50]) == [0.0, 2.0]
+
+
+def test_add_workbook_updates_counts_incrementally(tmp_path):
+    db = tmp_path / "bench.db"
+    assert benchmark.corpus_size(db) == 0
+    assert not db.exists()
+
+    assert benchmark.add_workbook(_workbook([FULLY, FULLY]), "h1", db)
+    assert benchmark.corpus_size(db) == 1
+    assert benchmark.add_workbook(_workbook([NOT_YET, NOT_YET]), "h2", db)
+    assert not benchmark.add_workbook(_workbook([NOT_YET, NOT_YET]), "h2", db)
+    assert benchmark.corpus_size(db) == 2
+
+    bands = benchmark.indicator_bands((50,), path=db).set_index("indicator")
+    assert bands.loc["A", "n"] == 2
+    assert bands.loc["A", "mean"] == 1.0        # (2 + 0) levels / 2 workbooks
+
+    shares = benchmark.level_shares(db)
+    assert shares.loc[("A", 1)].to_dict() == {1: 0.5, 4: 0.5}
+
+
+def test_corpus_size_sees_writes_from_another_process(tmp_path):
+    db = tmp_path / "bench.db"
+    repo = Path(__file__).resolve().parent.parent
+    script = (
+        "import sys, numpy as np, pandas as pd\n"
+        f"sys.path.insert(0, {str(repo)!r})\n"
+        "from dashboard import benchmark\n"
+        "from dashboard.history import COL_CURR, COL_IND\n"
+        f"df = pd.DataFrame({{COL_IND: ['A'], COL_CURR: [{FULLY!r}], 'LEVEL': [1]}})\n"
+        f"benchmark.add_workbook(df, sys.argv[1], {str(db)!r})\n"
+    )
+
+    def add_in_child(workbook_hash):
+        subprocess.run([sys.executable, "-c", script, workbook_hash], check=True)
+
+    assert benchmark.corpus_size(db) == 0          # no database yet
+    add_in_child("h1")
+    assert benchmark.corpus_size(db) == 1
+    assert benchmark.indicator_bands((50,), path=db)["n"].tolist() == [1]
+    add_in_child("h2")
+    assert benchmark.corpus_size(db) == 2
+    assert benchmark.indicator_bands((50,), path=db)["n"].tolist() == [2]
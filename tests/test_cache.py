@@ -0,0 +1,69 @@
+import threading
+import time
+
+from dashboard.cache import SharedCache
+
+
+def test_lru_eviction_by_size():
+    cache = SharedCache(budget_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"      # a becomes most recently used
+    cache.put("c", b"cccc")               # 12 bytes > 10: evict least recently used (b)
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_value_larger_than_budget_is_not_cached():
+    cache = SharedCache(budget_bytes=4)
+    cache.put("a", b"aa")
+    assert cache.put("big", b"x" * 10) == b"x" * 10
+    assert cache.get("big") is None
+    assert cache.get("a") == b"aa"
+
+
+def test_counters():
+    cache = SharedCache(budget_bytes=100)
+    cache.get("missing")
+    cache.put("k", b"v")
+    cache.get("k")
+    cache.get("k")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_get_or_compute_computes_once_for_concurrent_callers():
+    cache = SharedCache(budget_bytes=100)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return b"value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert results == [b"value"] * 5
+
+
+def test_get_or_compute_retries_after_failure():
+    cache = SharedCache(budget_bytes=100)
+
+    def boom():
+        raise RuntimeError("parse failed")
+
+    try:
+        cache.get_or_compute("k", boom)
+    except RuntimeError:
+        pass
+    assert cache.get_or_compute("k", lambda: b"ok") == b"ok"
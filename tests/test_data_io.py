@@ -0,0 +1,100 @@
+import io
+import zipfile
+
+import openpyxl
+import pytest
+
+from dashboard import data_io
+from dashboard.constants import SHEET_NAME_1, SHEET_NAME_2
+from dashboard.data_io import WorkbookRejected, inspect_workbook
+from dashboard.loadtest import make_workbook
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Bytes of a generated 6-indicator workbook (24 questions) with the template layout."""
+    path = tmp_path / "assessment.xlsx"
+    make_workbook(path, n_indicators=6)
+    return path.read_bytes()
+
+
+def _edit(data, edit):
+    wb = openpyxl.load_workbook(io.BytesIO(data))
+    edit(wb)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _with_entry(data, name, payload):
+    """Copy of the archive with ``name`` replaced or added."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            if info.filename != name:
+                dst.writestr(info, src.read(info))
+        dst.writestr(name, payload)
+    return buf.getvalue()
+
+
+def _rejected(data, match):
+    with pytest.raises(WorkbookRejected, match=match):
+        inspect_workbook(io.BytesIO(data))
+
+
+def test_template_workbook_is_accepted_and_parsed(workbook):
+    dims = inspect_workbook(io.BytesIO(workbook))
+    assert dims[SHEET_NAME_1] == (3 + 24, 10)
+    df1, df3 = data_io._parse_workbook(workbook)
+    assert len(df1) == 24 and len(df3) == 6
+    assert df1["LEVEL"].tolist()[:4] == [1, 2, 3, 4]
+    assert {"RESPONSE_NUMBER", "TARGET_NUMBER", "DIFF", "BUCKET"} <= set(df1.columns)
+
+
+def test_byte_limit(workbook, monkeypatch):
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_BYTES", len(workbook) - 1)
+    _rejected(workbook, "limit is")
+
+
+def test_not_a_zip():
+    _rejected(b"name,level\nA,1\n", "Not a valid .xlsx")
+
+
+def test_total_uncompressed_limit(workbook, monkeypatch):
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_UNZIPPED_BYTES", 1000)
+    _rejected(workbook, "Workbook expands to")
+
+
+def test_worksheet_entry_limit(workbook, monkeypatch):
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_SHEET_XML_BYTES", 1000)
+    _rejected(workbook, "xl/worksheets/sheet1.xml")
+
+
+def test_shared_strings_entry_limit(workbook, monkeypatch):
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_SHARED_STRINGS_BYTES", 1000)
+    _rejected(_with_entry(workbook, "xl/sharedStrings.xml", b" " * 2000), "xl/sharedStrings.xml")
+
+
+def test_missing_sheet(workbook):
+    _rejected(_edit(workbook, lambda wb: wb.remove(wb[SHEET_NAME_2])), f"Sheet '{SHEET_NAME_2}' is missing")
+
+
+def test_missing_header(workbook):
+    def rename(wb):
+        wb[SHEET_NAME_1]["E3"] = "Indicator"
+    _rejected(_edit(workbook, rename), "missing column\\(s\\): INDICATOR")
+
+
+def test_row_and_column_limits(workbook, monkeypatch):
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_ROWS", 10)
+    _rejected(workbook, "rows, the limit is 10")
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_ROWS", 5000)
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_COLS", 5)
+    _rejected(workbook, "columns, the limit is 5")
+
+
+def test_parse_caps_rows_when_dimension_tag_is_wrong(workbook, monkeypatch):
+    # _parse_workbook does not rely on the dimension tag checked by inspect_workbook
+    monkeypatch.setattr(data_io, "UPLOAD_MAX_ROWS", 10)
+    with pytest.raises(WorkbookRejected, match="more than 10 rows"):
+        data_io._parse_workbook(workbook)
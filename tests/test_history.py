@@ -0,0 +1,71 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from dashboard import history
+from dashboard.history import COL_CURR, COL_DIM, COL_IND, COL_NUM, COL_TARG
+
+NOT_YET = "Not implemented yet | 尚未实施 "
+BROADLY = "Broadly implemented | 广泛实施"
+FULLY = "Fully implemented | 全面实施"
+DONT_KNOW = "Don't know | 不知道"
+
+
+def _workbook(answers, target=FULLY):
+    """Minimal parsed Sheet 1: one indicator "A" with levels 1..len(answers)."""
+    n = len(answers)
+    return pd.DataFrame({
+        COL_NUM: [f"01.{i + 1}" for i in range(n)],
+        COL_DIM: ["D"] * n,
+        COL_IND: ["A"] * n,
+        COL_CURR: answers,
+        COL_TARG: [target] * n,
+        "LEVEL": np.arange(1, n + 1),
+    })
+
+
+def test_ingest_deduplicates_by_content_hash(tmp_path):
+    db = tmp_path / "history.db"
+    first, created = history.ingest(_workbook([FULLY]), "h1", "Org", date(2025, 1, 10), db)
+    assert created
+    again, created = history.ingest(_workbook([NOT_YET]), "h1", "Other", date(2025, 4, 10), db)
+    assert (again, created) == (first, False)
+    assert history.organisations(db) == ["Org"]
+
+
+def test_latest_assessment_per_quarter_and_delta_signs(tmp_path):
+    db = tmp_path / "history.db"
+    history.ingest(_workbook([NOT_YET, NOT_YET]), "q1-early", "Org", date(2025, 1, 5), db)
+    history.ingest(_workbook([BROADLY, NOT_YET]), "q1-late", "Org", date(2025, 3, 20), db)
+    history.ingest(_workbook([FULLY, FULLY]), "q2", "Org", date(2025, 5, 1), db)
+
+    trends = history.indicator_trends("Org", db)
+    assert trends["quarter"].tolist() == ["2025Q1", "2025Q2"]
+    q1, q2 = trends.itertuples(index=False)
+    assert q1.maturity == 1 / 3                   # (2/3 + 0) / 2, from the later Q1 assessment
+    assert np.isnan(q1.maturity_delta)
+    assert q2.maturity == 1.0
+    assert q2.maturity_delta > 0 and q2.gap_delta < 0
+
+
+def test_delta_only_between_consecutive_quarters(tmp_path):
+    db = tmp_path / "history.db"
+    history.ingest(_workbook([NOT_YET]), "q1", "Org", date(2025, 1, 5), db)
+    history.ingest(_workbook([FULLY]), "q3", "Org", date(2025, 8, 5), db)
+    trends = history.indicator_trends("Org", db)
+    assert trends["quarter"].tolist() == ["2025Q1", "2025Q3"]
+    assert trends["maturity_delta"].isna().all()
+
+
+def test_unanswered_questions_are_skipped(tmp_path):
+    db = tmp_path / "history.db"
+    history.ingest(_workbook([FULLY, DONT_KNOW, None]), "h", "Org", date(2025, 1, 5), db)
+    assert history.indicator_trends("Org", db)["maturity"].tolist() == [1.0]
+
+
+def test_read_paths_do_not_create_the_database(tmp_path):
+    db = tmp_path / "history.db"
+    assert history.organisations(db) == []
+    assert history.indicator_trends("Org", db).empty
+    assert not db.exists()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from dashboard import scenarios
+
+COL_IND = "INDICATOR | 指标"
+
+
+def _data():
+    qg = pd.DataFrame({
+        "NUMBER | 编号": ["01.1", "01.2", "02.1", "02.2"],
+        COL_IND: ["A", "A", "B", "B"],
+        "LEVEL": [1, 2, 1, 2],
+        "RESPONSE_NUMBER": [1, 3, 99, 0],
+        "TARGET_NUMBER": [3, 4, 4, 2],
+    })
+    overview = pd.DataFrame({COL_IND: ["A", "B"], "G1": [1.0, 0.0], "G2": [0.0, 2.0]})
+    return scenarios.build_scenario_data(qg, overview, ["G1", "G2"])
+
+
+def test_build_scenario_data():
+    data = _data()
+    # "Not relevant" (99) dropped, "Don't know" (0) counts as not implemented
+    assert list(data.questions["NUMBER | 编号"]) == ["01.1", "01.2", "02.2"]
+    assert data.current.tolist() == [1, 3, 1]
+    assert data.target.tolist() == [3, 4, 2]
+    assert data.q_ind.tolist() == [0, 0, 1]
+
+
+def test_targets_and_scores():
+    data = _data()
+    targets = scenarios.targets_for_levels(data, np.array([1, 2]))
+    assert targets.tolist() == [[4, 3, 1], [4, 4, 4]]   # 02.2 is a level-2 question
+    score, gain = scenarios.score_scenarios(data, targets, np.array([[1.0, 0.0], [0.5, 1.0]]))
+    assert gain.tolist() == [[3, 0, 0], [3, 1, 3]]
+    assert np.allclose(score, [[3, 0, 0], [1.5, 0.5, 6]])
+
+
+def test_workbook_targets_scenario():
+    data = _data()
+    score, gain = scenarios.score_scenarios(data, data.target, np.ones((1, 2)))
+    assert gain.tolist() == [[2, 1, 1]]
+
+
+def test_select_under_budget_skips_measures_that_do_not_fit():
+    score = np.array([[3.0, 2.7, 0.5]])
+    effort = np.array([[3.0, 3.0, 1.0]])
+    selected, value = scenarios.select_under_budget(score, effort, 4)
+    assert selected.tolist() == [[True, False, True]]
+    assert np.allclose(value, [3.5])
+
+
+def test_select_under_budget_per_scenario():
+    score = np.array([[1.0, 4.0, 0.0], [2.0, 2.0, 2.0]])
+    effort = np.array([[1.0, 2.0, 1.0], [1.0, 1.0, 1.0]])
+    selected, value = scenarios.select_under_budget(score, effort, 2)
+    assert selected.tolist() == [[False, True, False], [True, True, False]]
+    assert np.allclose(value, [4.0, 4.0])
+
+
+def test_top_k():
+    values = np.array([0.1, 5.0, 3.0, 4.0])
+    assert scenarios.top_k(values, 2).tolist() == [1, 3]
+    assert scenarios.top_k(np.array([[1.0, 3.0, 2.0]]), 5).tolist() == [[1, 2, 0]]